@@ -1,11 +1,14 @@
 from os.path import isfile
 
+import tools
+
 from .encryption import string as estr
 
 # used to maintain consistent in separating user attributes
 # newlines separate users
 seperator = "///"
 
+
 class User:
     """The class that holds info about users"""
 
@@ -121,7 +124,8 @@ class UserList:
 
     def __init__(self, file_name="users.txt"):
         self.file = file_name
-        # ensure the file exists
+        # ensure the file exists, its latest version may not have been committed yet
+        tools.storage.flush(self.file)
         if not isfile(self.file):
             f = open(self.file, "w")
             f.close()
@@ -132,7 +136,7 @@ class UserList:
 
     def read(self):
         """Updates self.list"""
-        f = open(self.file, "r")
+        f = open(self.file, "r", encoding="utf-8")
         file_str = f.read()
         f.close()
 
@@ -320,9 +324,9 @@ class UserList:
 
     def save(self):
         """Overwrites file with updated list"""
-        with open(self.file, "w") as f:
-            for i in range(len(self.list)):
-                f.write(str(self.list[i]) + "\n")
+        tools.storage.write(
+            self.file, ((str(user) + "\n").encode("utf-8") for user in self.list)
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+This file contains the batched move engine for working with many cubes at once
+
+This is designed for offline analysis, such as checking scrambles, replaying stored
+histories and testing the move code. Every cube is one row of an N x 54 array of
+colour indices, so a move is applied to all of them with a single gather.
+
+black, isort and flake8 used for formatting
+"""
+
+import numpy
+from facelets import FaceletState
+from moves import PERMUTATION_TABLE, STICKER_COUNT, compile_sequence, get_index
+
+
+class CubeBatch:
+    """Holds N cubes as an N x 54 array of colour indices and applies moves to them"""
+
+    def __init__(self, facelets):
+        """
+        :param facelets: the colour indices of every cube, one cube per row
+        :type facelets: numpy.ndarray or list[FaceletState]
+        """
+        if len(facelets) > 0 and isinstance(facelets[0], bytes):
+            # join the states so they can be read as one buffer
+            facelets = numpy.frombuffer(b"".join(facelets), dtype=numpy.uint8)
+        self.facelets = numpy.array(facelets, dtype=numpy.uint8).reshape(
+            -1, STICKER_COUNT
+        )
+        """The N x 54 array of colour indices
+        :type: numpy.ndarray"""
+
+    @classmethod
+    def repeat(cls, facelets, count):
+        """
+        Creates a batch of copies of the same cube
+
+        :param facelets: the 54 colour indices of the cube
+        :type facelets: numpy.ndarray or FaceletState
+        :param count: the number of cubes in the batch
+        :type count: int
+        :return: the batch
+        :rtype: CubeBatch
+        """
+        if isinstance(facelets, bytes):
+            facelets = numpy.frombuffer(facelets, dtype=numpy.uint8)
+        return cls(numpy.tile(facelets, (count, 1)))
+
+    def __len__(self):
+        return len(self.facelets)
+
+    def __getitem__(self, index):
+        """
+        :param index: the row of the cube
+        :type index: int
+        :return: the state of a single cube
+        :rtype: FaceletState
+        """
+        return FaceletState(self.facelets[index])
+
+    @staticmethod
+    def _to_index(move):
+        """
+        :param move: a move dictionary or move index
+        :type move: dict or int
+        :return: the move index
+        :rtype: int
+        """
+        if isinstance(move, dict):
+            return get_index(move)
+        return move
+
+    def apply(self, move):
+        """
+        Applies the same move to every cube
+
+        :param move: a move in the format stored by game_data.MoveStack,
+            or its index in moves.MOVES
+        :type move: dict or int
+        :rtype: None
+        """
+        self.facelets = self.facelets[:, PERMUTATION_TABLE[self._to_index(move)]]
+
+    def apply_each(self, move_indices):
+        """
+        Applies a different move to each cube
+
+        :param move_indices: the index in moves.MOVES of the move for each row
+        :type move_indices: numpy.ndarray or list[int]
+        :rtype: None
+        """
+        move_indices = numpy.asarray(move_indices, dtype=numpy.intp)
+        if move_indices.shape != (len(self),):
+            raise ValueError("There must be one move for each cube")
+        self.facelets = numpy.take_along_axis(
+            self.facelets, PERMUTATION_TABLE[move_indices], axis=1
+        )
+
+    def apply_sequence(self, moves):
+        """
+        Applies the same sequence of moves to every cube, in order
+
+        :param moves: moves in the format stored by game_data.MoveStack,
+            or their indices in moves.MOVES
+        :type moves: list[dict] or list[int]
+        :rtype: None
+        """
+        # the sequence is combined into one permutation so it is a single gather
+        self.facelets = self.facelets[:, compile_sequence(moves)]
+
+    def solved(self):
+        """
+        Checks which cubes are solved,
+        that is every face is the same colour as its middle square
+
+        :return: a boolean for each cube, True if it is solved
+        :rtype: numpy.ndarray
+        """
+        faces = self.facelets.reshape(-1, 6, 9)
+        return (faces == faces[:, :, 4:5]).all(axis=(1, 2))
@@ -7,14 +7,202 @@ and the basic turn and rotation functions for interacting with the cube
 black, isort and flake8 used for formatting
 """
 
-import copy
+import logging
 
+import data
+import facelets
 import game_data as gd
 import interface
-import numpy
 import pygame
 from game_data import BLACK, default_colour, default_cube
 
+logger = logging.getLogger(__name__)
+
+
+class StickerAtlas:
+    """
+    Holds every sticker image on one surface, drawn once
+
+    There is one sprite for each colour of the palette in each sticker shape. The
+    cube images are made by blitting areas of the atlas instead of drawing each
+    sticker again.
+    """
+
+    SHAPES = {
+        # the flat square used by the net
+        "square": ((50, 50), ((0, 0), (49, 0), (49, 49), (0, 49))),
+        # the slanted squares of the 3D cube
+        "right": ((50, 75), ((0, 25), (50, 0), (50, 50), (0, 75))),
+        "front": ((50, 75), ((0, 0), (50, 25), (50, 75), (0, 50))),
+        "top": ((100, 50), ((50, 0), (100, 25), (50, 50), (0, 25))),
+    }
+    """The size and polygon of each sticker shape
+    :type: dict[str, tuple[tuple[int, int], tuple[tuple[int, int]]]]"""
+
+    def __init__(self, palette, background):
+        """
+        :param palette: the colours of the stickers
+        :type palette: facelets.Palette
+        :param background: the RGB value around each sticker, this is transparent
+        :type background: tuple[int, int, int] or list[int]
+        """
+        cell_width = max(size[0] for size, _ in self.SHAPES.values())
+        height = sum(size[1] for size, _ in self.SHAPES.values())
+        self.surface = pygame.Surface((cell_width * len(palette), height))
+        """The image holding every sprite, each shape is a row of colours
+        :type: pygame.Surface"""
+        self.surface.fill(background)
+        self.surface.set_colorkey(background)
+        self.areas = {}
+        """The area of the surface of each sprite, indexed by shape then colour index
+        :type: dict[str, list[pygame.Rect]]"""
+
+        y = 0
+        for shape, (size, points) in self.SHAPES.items():
+            self.areas[shape] = []
+            for index, colour in enumerate(palette.colours.tolist()):
+                # drawn on its own first so the shape is clipped to its size
+                sprite = pygame.Surface(size)
+                sprite.fill(background)
+                pygame.draw.polygon(sprite, colour, points)
+                area = pygame.Rect((index * cell_width, y), size)
+                self.surface.blit(sprite, area)
+                self.areas[shape].append(area)
+            y += size[1]
+
+
+def _make_layout(faces):
+    """
+    Works out where every sticker of some faces is placed on a cube image
+
+    :param faces: for each face, the face number, the sticker shape, the position of
+        the face and the offset of each row and column from it
+    :type faces: list[tuple]
+    :return: the sticker index, shape and position of each sticker in drawing order
+    :rtype: list[tuple[int, str, tuple[int, int]]]
+    """
+    layout = []
+    for face, shape, (x, y), row_offset, column_offset in faces:
+        for row in range(3):
+            for column in range(3):
+                row_x, row_y = row_offset(row)
+                column_x, column_y = column_offset(column)
+                position = (x + row_x + column_x, y + row_y + column_y)
+                layout.append((face * 9 + row * 3 + column, shape, position))
+    return layout
+
+
+NET_LAYOUT = _make_layout(
+    # 4 of the faces are placed next to each other, 180 includes 10 pixels spacing,
+    # then the top is above the front face and the bottom below it.
+    # Rows and columns are 60 apart, which includes 10 pixels spacing
+    [
+        (face, "square", position, lambda i: (0, 60 * i), lambda i: (60 * i, 0))
+        for face, position in (
+            (0, (0, 180)),
+            (1, (180, 180)),
+            (2, (360, 180)),
+            (3, (540, 180)),
+            (4, (180, 0)),
+            (5, (180, 360)),
+        )
+    ]
+)
+"""Where each sticker is drawn on the net image
+:type: list[tuple[int, str, tuple[int, int]]]"""
+
+CUBE_3D_LAYOUT = _make_layout(
+    # drawn right, front then top so the nearer faces are drawn over the edges,
+    # 55 and 30 include 5 pixels spacing
+    [
+        # to the right of the front face, each square is higher than the last
+        (
+            2,
+            "right",
+            (205, 90),
+            lambda i: (0, 55 * i),
+            lambda i: (55 * i, 60 - 30 * i),
+        ),
+        # below the top face, each square is lower than the last
+        (1, "front", (40, 90), lambda i: (0, 55 * i), lambda i: (55 * i, 30 * i)),
+        # the rows are placed from the back corner to the front
+        (
+            4,
+            "top",
+            (0, 0),
+            lambda i: (150 - 55 * i, 30 * i),
+            lambda i: (55 * i, 30 * i),
+        ),
+    ]
+)
+"""Where each sticker is drawn on the 3D image
+:type: list[tuple[int, str, tuple[int, int]]]"""
+
+DEFAULT_STICKERS = facelets.from_nested(default_cube, gd.palette).tolist()
+"""The colour index of every sticker of the default cube
+:type: list[int]"""
+
+_atlas = None
+# the palette and background the atlas was drawn with
+_atlas_settings = None
+_targets = {}
+# the state version each target was last drawn with
+_drawn_versions = {}
+
+
+def _get_atlas():
+    """
+    Gets the sticker atlas, drawing it again if the palette or background changed
+
+    :return: the atlas for the current palette and background
+    :rtype: StickerAtlas
+    """
+    global _atlas, _atlas_settings
+    settings = (gd.palette.colours.tobytes(), tuple(gd.default_colour))
+    if _atlas_settings != settings:  # only drawn once it is needed
+        _atlas = StickerAtlas(gd.palette, gd.default_colour)
+        _atlas_settings = settings
+        _drawn_versions.clear()  # every image was drawn with the old atlas
+    return _atlas
+
+
+def _draw_stickers(size, layout, default):
+    """
+    Draws the stickers of the cube into a surface that is reused between calls
+
+    The surface is only redrawn if the cube state has changed since it was last drawn.
+
+    :param size: the size of the image
+    :type size: tuple[int, int]
+    :param layout: where each sticker is drawn, see _make_layout
+    :type layout: list[tuple[int, str, tuple[int, int]]]
+    :param default: if True, uses the default image instead of the current state
+    :type default: bool
+    :return: the image
+    :rtype: pygame.Surface
+    """
+    atlas = _get_atlas()
+    if (size, default) not in _targets:
+        _targets[size, default] = pygame.Surface(size)
+    surf = _targets[size, default]
+
+    # the default cube never changes
+    version = None if default else gd.state_version
+    if _drawn_versions.get((size, default), -1) == version:
+        return surf
+    _drawn_versions[size, default] = version
+
+    stickers = DEFAULT_STICKERS if default else gd.used_cube.tolist()
+    surf.fill(gd.default_colour)
+    surf.blits(
+        [
+            (atlas.surface, position, atlas.areas[shape][stickers[index]])
+            for index, shape, position in layout
+        ],
+        doreturn=False,
+    )
+    return surf
+
 
 class CubeNet:
     """Handles the display of the cube as a net to a fixed position on the screen"""
@@ -29,101 +217,31 @@ class CubeNet:
         # pos is centre
         self.screen = surface
         self.pos = pos
+        self.area = interface.DirtyArea(surface, default_colour)
 
     def update(self):
         """
-        Updates the cube image and re-blits it to the surface
+        Re-blits the cube image to the surface if the cube has changed
 
-        :rtype: None
+        :return: the rectangles of the surface that have changed
+        :rtype: list[pygame.Rect]
         """
-        image = self.get_image()
-        self.screen.blit(image, image.get_rect(center=self.pos))
+        return self.area.draw(gd.state_version, self.get_image, self.pos, True)
 
     @staticmethod
     def get_image(default=False):
         """
         Creates the image of the cube from the current state of the cube
 
+        The image is drawn into the same surface each time,
+        so it should be blitted or copied before the next call.
+
         :param default: if True, uses the default image instead of the current state
         :type default: bool
         :return: the image of the cube as a 720x540 surface
         :rtype: pygame.Surface
         """
-        surf = pygame.Surface((720, 540))
-        surf.fill(default_colour)
-        colour_3d_array = gd.used_cube
-        if default:
-            colour_3d_array = default_cube
-
-        def square(colour):
-            """
-            Creates a single square with the given colour
-
-            :param colour: the RGB values of the colour
-            :type colour: tuple[int, int, int]
-            :return: the square image, 50x50
-            :rtype: pygame.Surface
-            """
-            surf = pygame.Surface((50, 50))
-            surf.fill(colour)
-            return surf
-
-        def row(colour_list):
-            """
-            Creates the image of a row of 3 squares
-
-            :param colour_list: List len(3) of tuples, where each tuple is an RGB value
-            :type colour_list: list[tuple[int, int, int]]
-            :return: the row image, 170*50
-            :rtype: pygame.Surface
-            """
-            surf = pygame.Surface((170, 50))
-            surf.fill(default_colour)
-            for i in range(3):
-                # iterates alongside the list of colours,
-                # getting a square with the respective colour and
-                # blitting it to calculated position
-                # i * 50 ensures the square is blitted after the previous one;
-                # not inside it
-                # i * 10 adds 10 spacing between the cubes
-                surf.blit(square(colour_list[i]), (i * 50 + i * 10, 0))
-            return surf
-
-        def face(colour_array):
-            """
-            Creates one face (side) from 3 rows
-
-            :param colour_array: 2D array (3x3)(row x col) of tuples,
-                where each tuple is an RGB value
-            :type colour_array: list[list[tuple[int, int, int]]]
-            :return: the face image, 170*170
-            :rtype: pygame.Surface
-            """
-            surf = pygame.Surface((170, 170))
-            surf.fill(default_colour)
-            for i in range(3):
-                # iterates alongside the list of rows,
-                # getting and blitting the row image to calculated position
-                # i * 50 ensures the row is placed beneath,
-                # and not inside, the previous row
-                # i * 10 is for spacing between the rows
-                surf.blit(row(colour_array[i]), (0, i * 50 + i * 10))
-            return surf
-
-        # 4 of the faces are placed next to each other so a loop can place them
-        for i in range(4):
-            surf.blit(
-                face(colour_3d_array[i]),  # gets the image of the face
-                # 180 * i includes 10 pixels spacing
-                # placed 180 down to allow top to be placed above with 10 pixels spacing
-                (180 * i, 180),
-            )
-
-        # 180 x val aligns with front face
-        surf.blit(face(colour_3d_array[4]), (180, 0))
-        # 360 is below face image with 10 pixels spacing
-        surf.blit(face(colour_3d_array[5]), (180, 360))
-        return surf
+        return _draw_stickers((720, 540), NET_LAYOUT, default)
 
 
 class Cube3D(CubeNet):
@@ -138,204 +256,15 @@ class Cube3D(CubeNet):
         """
         Creates the image of the cube from its current state
 
+        The image is drawn into the same surface each time,
+        so it should be blitted or copied before the next call.
+
         :param default: if True, uses the default image instead of the current state
         :type default: bool
         :return: the cube image, 365*335
         :rtype: pygame.Surface
         """
-        surf = pygame.Surface((365, 335))
-        surf.fill(default_colour)
-        colour_3d_array = gd.used_cube
-        if default:
-            colour_3d_array = default_cube
-
-        def right():
-            """
-            Draws the right face of the cube to the surf, it is a slanted square
-
-            :rtype: None
-            """
-
-            def square(colour):
-                """
-                Creates a slanted cube of solid colour
-
-                :param colour: RGB values
-                :type colour: tuple[int, int, int]
-                :return: the square image, 50*75
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((50, 75))
-                surf.fill(default_colour)
-                pygame.draw.polygon(surf, colour, ((0, 25), (50, 0), (50, 50), (0, 75)))
-                surf.set_colorkey(default_colour)  # make background transparent
-                return surf
-
-            def row(colour_list):
-                """
-                Creates a slanted row of 3 squares
-
-                :param colour_list: List len(3) of tuples of RGB values
-                :type colour_list: list[tuple[int, int, int]]
-                :return: the row image, 165*135
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((165, 135))
-                surf.fill(default_colour)
-                for i in range(3):
-                    # 55 includes 5 pixels spacing
-                    # -30 includes 5 pixels spacing
-                    surf.blit(square(colour_list[i]), (55 * i, 60 - (30 * i)))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            def face(colour_array):
-                """
-                Stacks 3 row images to create a face of 9 squares
-
-                :param colour_array: 2D (3x3)(row x col) array of tuples of RGB values
-                :type colour_array: list[list[tuple[int, int, int]]]
-                :return: the row image, 165*250
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((165, 250))
-                surf.fill(default_colour)
-                for i in range(3):
-                    surf.blit(row(colour_array[i]), (0, 55 * i))
-                return surf
-
-            # positioned to the right of front face with 5 pixels spacing
-            surf.blit(face(colour_3d_array[2]), (205, 90))
-
-        def front():
-            """
-            Draws the front face of the cube to the surf, it s a slanted square
-
-            :rtype: None
-            """
-
-            def square(colour):
-                """
-                Creates a slanted cube of solid colour
-
-                :param colour: RGB values
-                :type colour: tuple[int, int, int]
-                :return: the square image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((50, 75))
-                surf.fill(default_colour)
-                pygame.draw.polygon(surf, colour, ((0, 0), (50, 25), (50, 75), (0, 50)))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            def row(colour_list):
-                """
-                Creates the image of a row of 3 squares
-
-                :param colour_list: List len(3) of tuples of RGB values
-                :type colour_list: list[tuple[int, int, int]]
-                :return: the row image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((165, 135))
-                surf.fill(default_colour)
-                for i in range(3):
-                    # 55 includes 5 pixels spacing
-                    # 30 includes 5 pixels spacing
-                    surf.blit(square(colour_list[i]), (55 * i, 30 * i))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            def face(colour_array):
-                """
-                Stacks 3 row images to create a face of 9 squares
-
-                :param colour_array: 2D array (3x3)(row x col) of tuples of RGB values
-                :type colour_array: list[list[tuple[int, int, int]]]
-                :return: the face image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((165, 250))
-                surf.fill(default_colour)
-                for i in range(3):
-                    # 55 includes 5 pixels spacing
-                    surf.blit(row(colour_array[i]), (0, 55 * i))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            # positioned below top of front face with 5 pixels spacing
-            surf.blit(face(colour_3d_array[1]), (40, 90))
-
-        def top():
-            """
-            Draws the top face of the cube to the surf,
-            it is a horizontally stretched square
-
-            :rtype: None
-            """
-
-            def square(colour):
-                """
-                Creates a horizontally stretched cube of solid colour
-
-                :param colour: RGB values
-                :type colour: tuple[int, int, int]
-                :return: the square image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((100, 50))
-                surf.fill(default_colour)
-                pygame.draw.polygon(
-                    surf, colour, ((50, 0), (100, 25), (50, 50), (0, 25))
-                )
-                surf.set_colorkey(default_colour)
-                return surf
-
-            def row(colour_list):
-                """
-                Creates the image of a row of 3 squares
-
-                :param colour_list: List len(3) of tuples of RGB values
-                :type colour_list: list[tuple[int, int, int]]
-                :return: the row image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((215, 120))
-                surf.fill(default_colour)
-                for i in range(3):
-                    # 55 includes 5 pixels spacing
-                    # 30 includes 5 pixels spacing
-                    surf.blit(square(colour_list[i]), (55 * i, 30 * i))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            def face(colour_array):
-                """
-                Stacks 3 row images to create a face of 9 squares
-
-                :param colour_array: 2D array (3x3)(row x col) of tuples of RGB values
-                :type colour_array: list[list[tuple[int, int, int]]]
-                :return: the face image
-                :rtype: pygame.Surface
-                """
-                surf = pygame.Surface((370, 315))
-                surf.fill(default_colour)
-                for i in range(3):
-                    # 150 - to place bottom to top
-                    # 55 includes 5 pixels spacing
-                    # 30 includes 5 pixels spacing
-                    surf.blit(row(colour_array[i]), (150 - (55 * i), 30 * i))
-                surf.set_colorkey(default_colour)
-                return surf
-
-            surf.blit(face(colour_3d_array[4]), (0, 0))
-
-        right()
-        front()
-        top()
-
-        return surf
+        return _draw_stickers((365, 335), CUBE_3D_LAYOUT, default)
 
 
 class CubeGuide(Cube3D):
@@ -345,20 +274,63 @@ class CubeGuide(Cube3D):
     This class inherits from Cube3D and overrides the get_image method
     """
 
+    assets = interface.AssetCache(data.asset_directory)
+    """The guide image for each colour scheme and font,
+    it only shows the default cube so it doesn't change otherwise
+    :type: interface.AssetCache"""
+
+    @staticmethod
+    def get_settings():
+        """
+        :return: the values the image is drawn with, the image only changes when
+            these do
+        :rtype: tuple
+        """
+        font = data.guide_font
+        return (
+            tuple(gd.default_colour),
+            tuple(gd.guide_arrow_colour),
+            gd.palette.colours.tobytes(),  # the stickers are drawn from the palette
+            font.name,
+            font.size,
+            font.style,
+        )
+
     @classmethod
     def get_image(cls):
+        """
+        Gets the image of the default cube with added instructions
+
+        :return: the cube image, 600*600
+        :rtype: pygame.Surface
+        """
+        settings = cls.get_settings()
+        background, colour = settings[:2]
+        return cls.assets.get(
+            "guide",
+            settings,
+            lambda: cls.make_image(background, colour, data.guide_font),
+        )
+
+    @classmethod
+    def make_image(cls, background, colour, font):
         """
         Creates the image of the default cube with added instructions
 
+        :param background: the colour behind the cube and arrows
+        :type background: tuple[int, int, int]
+        :param colour: the colour of the arrows
+        :type colour: tuple[int, int, int]
+        :param font: the font of the letters on the arrows
+        :type font: pygame.freetype.Font
         :return: the cube image, 600*600
         :rtype: pygame.Surface
         """
         surf = pygame.Surface((600, 600))
-        surf.fill(default_colour)
-        colour = gd.guide_arrow_colour
-        if default_colour == colour:
+        surf.fill(background)
+        if background == colour:
             # arrows will blend into background
-            print("BAD idea, change guide arrow colour first")
+            logger.warning("BAD idea, change guide arrow colour first")
 
         def arrow_top(text, angle=0):
             """
@@ -372,22 +344,22 @@ class CubeGuide(Cube3D):
             :rtype: pygame.Surface
             """
             surf = pygame.Surface((100, 100))
-            surf.fill(default_colour)
+            surf.fill(background)
             pygame.draw.polygon(
                 surf,
                 colour,
                 ((13, 13), (50, 0), (63, 63), (50, 50), (50, 93), (25, 80), (25, 25)),
             )
-            surf.set_colorkey(default_colour)
+            surf.set_colorkey(background)
             # angle
             surf = pygame.transform.rotate(surf, angle)
             # letter
             surf.blit(
                 interface.text(
                     text=text,
-                    font=gd.guide_font,
+                    font=font,
                     foreground_colour=BLACK,
-                    background_colour=gd.default_colour,
+                    background_colour=background,
                 ),
                 (15, 0),
             )
@@ -405,7 +377,7 @@ class CubeGuide(Cube3D):
             :rtype: pygame.Surface
             """
             surf = pygame.Surface((100, 100))
-            surf.fill(default_colour)
+            surf.fill(background)
             pygame.draw.polygon(
                 surf,
                 colour,
@@ -419,16 +391,16 @@ class CubeGuide(Cube3D):
                     (63, 75),
                 ),
             )
-            surf.set_colorkey(default_colour)
+            surf.set_colorkey(background)
             # angle
             surf = pygame.transform.rotate(surf, angle)
             # letter
             surf.blit(
                 interface.text(
                     text=text,
-                    font=gd.guide_font,
+                    font=font,
                     foreground_colour=BLACK,
-                    background_colour=gd.default_colour,
+                    background_colour=background,
                 ),
                 (35, 25),
             )
@@ -446,7 +418,7 @@ class CubeGuide(Cube3D):
             :rtype: pygame.Surface
             """
             surf = pygame.Surface((200, 100))
-            surf.fill(default_colour)
+            surf.fill(background)
             pygame.draw.polygon(
                 surf,
                 colour,
@@ -460,16 +432,16 @@ class CubeGuide(Cube3D):
                     (150, 0),
                 ),
             )
-            surf.set_colorkey(default_colour)
+            surf.set_colorkey(background)
             # angle
             surf = pygame.transform.rotate(surf, angle)
             # letter
             surf.blit(
                 interface.text(
                     text=text,
-                    font=gd.guide_font,
+                    font=font,
                     foreground_colour=BLACK,
-                    background_colour=gd.default_colour,
+                    background_colour=background,
                 ),
                 (0, 0),
             )
@@ -526,72 +498,12 @@ def turn(row_col, number, backwards=False, ignore_moves=False):
     :rtype: None
     """
 
-    if not ignore_moves:
-        # add the move to the moves list
-        # ignoring is useful for solving
-        gd.moves.push({"direction": row_col, "number": number, "backwards": backwards})
-        gd.move_count += 1
-    else:
-        gd.move_count -= 1
-
-    # loop to turn the row or column the correct number of times
-    loop = 1
-    if backwards:  # 3 right is used to achieve 1 left, 3 up to achieve 1 down
-        loop = 3
-
-    for _ in range(loop):
-        # make copies of the faces of the cube so the original state isn't lost
-        # deepcopy prevents pass by reference shenanigans
-        # by copying the value instead of creating a reference
-        face0 = copy.deepcopy(gd.used_cube[0])
-        face1 = copy.deepcopy(gd.used_cube[1])
-        face2 = copy.deepcopy(gd.used_cube[2])
-        face3 = copy.deepcopy(gd.used_cube[3])
-        face4 = copy.deepcopy(gd.used_cube[4])
-        face5 = copy.deepcopy(gd.used_cube[5])
-
-        n = number
-
-        if row_col:  # turn the row
-            (
-                gd.used_cube[2][n],
-                gd.used_cube[3][n],
-                gd.used_cube[0][n],
-                gd.used_cube[1][n],
-            ) = (
-                face1[n],
-                face2[n],
-                face3[n],
-                face0[n],
-            )
-            if number == 0:  # rotate the top face
-                gd.used_cube[4] = numpy.rot90(
-                    gd.used_cube[4], k=1, axes=(0, 1)
-                ).tolist()
-            elif number == 2:  # rotate the bottom face
-                gd.used_cube[5] = numpy.rot90(
-                    gd.used_cube[5], k=1, axes=(1, 0)
-                ).tolist()
-        else:  # turn the column
-            for i in range(3):
-                gd.used_cube[1][i][n] = face5[i][n]
-                # 2-i flips the row number for the back
-                # 2 - n flips the column number for the back
-                gd.used_cube[5][2 - i][n] = face3[i][2 - n]
-                gd.used_cube[3][2 - i][2 - n] = face4[i][n]
-                gd.used_cube[4][i][n] = face1[i][n]
-
-            if number == 0:  # rotate left face
-                gd.used_cube[0] = numpy.rot90(
-                    gd.used_cube[0], k=1, axes=(0, 1)
-                ).tolist()
-            elif number == 2:  # rotate right face
-                gd.used_cube[2] = numpy.rot90(
-                    gd.used_cube[2], k=1, axes=(1, 0)
-                ).tolist()
-
-
-def rotate(axis, ignore_moves=False):
+    move = {"direction": row_col, "number": number, "backwards": backwards}
+    # backwards turns are precomputed as 3 forward turns
+    gd.make_move(move, ignore_moves)
+
+
+def rotate(axis, ignore_moves=False, backwards=False):
     """
     Rotates the view of the cube without changing layout
 
@@ -599,42 +511,26 @@ def rotate(axis, ignore_moves=False):
     :type axis: str
     :param ignore_moves: whether to add the move to the moves list, defaults to False
     :type ignore_moves: bool or optional
+    :param backwards: whether to rotate the other way, defaults to False
+    :type backwards: bool or optional
+    :rtype: None
+    """
+    move = {"rotation": True, "direction": axis}
+    if backwards:
+        move["backwards"] = True
+    # x is every row turned, y is every column turned
+    gd.make_move(move, ignore_moves)
+
+
+def do_move(move):
+    """
+    Does a move without adding it to the moves list or changing the move count
+
+    The solver works from the state of the cube instead of undoing the user's
+    moves, so its moves say nothing about how many moves the user made.
+
+    :param move: a move in the format stored by game_data.MoveStack
+    :type move: dict
     :rtype: None
     """
-    # make copies of the faces of the cube so the original state isn't lost
-    # deepcopy prevents pass by reference shenanigans
-    # by copying the value instead of creating a reference
-    face0 = copy.deepcopy(gd.used_cube[0])
-    face1 = copy.deepcopy(gd.used_cube[1])
-    face2 = copy.deepcopy(gd.used_cube[2])
-    face3 = copy.deepcopy(gd.used_cube[2])
-    face3 = copy.deepcopy(gd.used_cube[3])
-    face4 = copy.deepcopy(gd.used_cube[4])
-    face5 = copy.deepcopy(gd.used_cube[5])
-
-    if not ignore_moves:  # add the move to the moves list
-        # ignoring is useful for solving
-        gd.moves.push({"rotation": True, "direction": axis})
-        gd.move_count += 1
-    else:
-        gd.move_count -= 1
-
-    if axis == "x":
-        for i in range(3):  # equivalent to a rotation along the x axis
-            turn(True, i, ignore_moves=True)
-    elif axis == "y":
-        for i in range(3):  # equivalent to a rotation along the y axis
-            turn(False, i, ignore_moves=True)
-    elif axis == "z":  # equivalent to a rotation along the z axis
-        # rotate the front and back faces
-        gd.used_cube[1] = numpy.rot90(gd.used_cube[1], k=1, axes=(1, 0)).tolist()
-        gd.used_cube[3] = numpy.rot90(gd.used_cube[3], k=1, axes=(0, 1)).tolist()
-
-        # required a lot of manual testing
-        # carefully test any changes
-        for j in range(3):
-            for i in range(3):
-                gd.used_cube[0][j][2 - i] = face5[i][j]
-                gd.used_cube[4][j][2 - i] = face0[i][j]
-                gd.used_cube[2][j][2 - i] = face4[i][j]
-                gd.used_cube[5][j][2 - i] = face2[i][j]
+    gd.move_cube(move)
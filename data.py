@@ -1,8 +1,8 @@
 """
-This file contains global data and settings information
+This file contains the settings that need pygame, such as fonts
 
-This data is used by multiple files in the program. It may be edited here or it could be
-provided to the user as settings for them to change.
+These are only used for drawing, so they are kept apart from the state of the cube in
+game_data.py, which can then be used without pygame. The colours are in game_data.py.
 
 black, isort and flake8 used for formatting
 """
@@ -13,20 +13,10 @@ from pygame import freetype
 pygame.font.init()
 pygame.freetype.init()
 
-# colours
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-YELLOW = (255, 255, 0)
-ORANGE = (255, 165, 0)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-GREY = (169, 169, 169)
-
-default_colour = GREY
-guide_arrow_colour = BLACK
-
-
 # fonts
 default_font = pygame.freetype.SysFont("calibri", 20)
 guide_font = pygame.freetype.SysFont("calibri", 20, bold=True)
+
+# images that only depend on settings, such as the guide, are saved here so they are
+# only drawn once. None keeps them in memory only
+asset_directory = None
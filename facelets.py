@@ -0,0 +1,163 @@
+"""
+This file contains the compact representation of the cube's state
+
+Each sticker (facelet) is stored as a single byte colour index, in the flat sticker
+order used by moves.py. A Palette maps those indices to RGB values so the state can
+be converted to and from the nested-list layout used by the renderers and save files.
+
+black, isort and flake8 used for formatting
+"""
+
+import numpy
+from moves import STICKER_COUNT
+
+
+class UnknownColour(Exception):
+    """This exception is raised when a colour is not in the palette"""
+
+    def __init__(self, colour):
+        """
+        :param colour: the RGB value that is not in the palette
+        :type colour: list[int] or tuple[int, int, int]
+        """
+        super().__init__(f"Colour not in palette: {colour}")
+
+
+class Palette:
+    """Maps colour indices to RGB values"""
+
+    def __init__(self, colours):
+        """
+        :param colours: the RGB value of each colour index, in index order
+        :type colours: list[list[int]] or list[tuple[int, int, int]]
+        """
+        self.colours = numpy.array(colours, dtype=numpy.uint8).reshape(-1, 3)
+        """The RGB value of each index as an n x 3 array
+        :type: numpy.ndarray"""
+        self.colours.setflags(write=False)
+
+    def __len__(self):
+        return len(self.colours)
+
+    def to_rgb(self, indices):
+        """
+        :param indices: an array of colour indices of any shape
+        :type indices: numpy.ndarray
+        :return: the RGB values, with an extra final dimension of 3
+        :rtype: numpy.ndarray
+        """
+        return self.colours[indices]
+
+    def to_indices(self, rgb):
+        """
+        Converts RGB values into colour indices
+
+        :param rgb: RGB values of any shape, the final dimension must be 3
+        :type rgb: list or numpy.ndarray
+        :return: the flat array of colour indices,
+            raises UnknownColour if any colour is not in the palette
+        :rtype: numpy.ndarray
+        """
+        rgb = numpy.asarray(rgb, dtype=numpy.uint8).reshape(-1, 3)
+        # compare every colour against every palette entry at once
+        matches = (rgb[:, None, :] == self.colours[None, :, :]).all(axis=2)
+        found = matches.any(axis=1)
+        if not found.all():
+            raise UnknownColour(rgb[numpy.argmin(found)].tolist())
+        return matches.argmax(axis=1).astype(numpy.uint8)
+
+
+class FaceletState(bytes):
+    """
+    An immutable cube state of 54 colour indices, one byte per sticker
+
+    As this is a bytes object it is hashable and may be used directly as a dict key.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, facelets):
+        """
+        :param facelets: the 54 colour indices in flat sticker order
+        :type facelets: bytes or numpy.ndarray or list[int]
+        """
+        if isinstance(facelets, numpy.ndarray):
+            facelets = facelets.astype(numpy.uint8, copy=False).tobytes()
+        self = super().__new__(cls, facelets)
+        if len(self) != STICKER_COUNT:
+            raise ValueError(f"A cube state needs {STICKER_COUNT} facelets")
+        return self
+
+    @classmethod
+    def from_nested(cls, cube, palette):
+        """
+        :param cube: the cube as a 3D array of faces, rows and columns of RGB values
+        :type cube: list[list[list[list[int]]]]
+        :param palette: the palette the colours are from
+        :type palette: Palette
+        :return: the state of the cube
+        :rtype: FaceletState
+        """
+        return cls(from_nested(cube, palette))
+
+    def to_array(self):
+        """
+        :return: a read only array of the colour indices
+        :rtype: numpy.ndarray
+        """
+        return numpy.frombuffer(self, dtype=numpy.uint8)
+
+    def to_nested(self, palette):
+        """
+        :param palette: the palette to get the colours from
+        :type palette: Palette
+        :return: the cube as a 3D array of faces, rows and columns of RGB values
+        :rtype: list[list[list[list[int]]]]
+        """
+        return to_nested(self.to_array(), palette)
+
+    def __repr__(self):
+        return f"FaceletState({bytes(self)!r})"
+
+
+def from_nested(cube, palette):
+    """
+    Converts a 6x3x3 nested list of RGB values into a flat array of colour indices
+
+    :param cube: the cube as a 3D array of faces, rows and columns of RGB values
+    :type cube: list[list[list[list[int]]]]
+    :param palette: the palette the colours are from
+    :type palette: Palette
+    :return: the 54 colour indices
+    :rtype: numpy.ndarray
+    """
+    facelets = palette.to_indices(cube)
+    if len(facelets) != STICKER_COUNT:
+        raise ValueError(f"A cube state needs {STICKER_COUNT} facelets")
+    return facelets
+
+
+def to_faces(facelets, palette):
+    """
+    :param facelets: the 54 colour indices
+    :type facelets: numpy.ndarray
+    :param palette: the palette to get the colours from
+    :type palette: Palette
+    :return: a 6x3x3x3 array of RGB values that can be indexed by face, row, column
+    :rtype: numpy.ndarray
+    """
+    return palette.to_rgb(facelets).reshape(6, 3, 3, 3)
+
+
+def to_nested(facelets, palette):
+    """
+    Converts a flat array of colour indices into a 6x3x3 nested list of RGB values
+
+    :param facelets: the 54 colour indices
+    :type facelets: numpy.ndarray
+    :param palette: the palette to get the colours from
+    :type palette: Palette
+    :return: the cube as a 3D array of faces, rows and columns of RGB values
+    :rtype: list[list[list[list[int]]]]
+    """
+    return to_faces(facelets, palette).tolist()
@@ -7,57 +7,46 @@ beyond the basic turn and rotation functions of the cube
 black, isort and flake8 used for formatting
 """
 
-import copy
+import heapq
+import logging
 import time
-from random import randint
 
+import frames
 import game_data as gd
+import hints
 import interface
-import numpy
 import pygame
 import tools
 import user_data as ud
-from cube import rotate, turn
-from game_data import BLACK, default_colour, default_cube, default_font
+from cube import do_move
+from data import default_font
+from game_data import BLACK, default_colour
 from validation import ValidateScreenPositions
 
-val = ValidateScreenPositions(1600, 900)
-
-
-def scramble():
-    """
-    Randomly scrambles the cube by making between 15 and 25 moves randomly
-
-    :rtype: None
-    """
-    # reset the cube
-    gd.used_cube = copy.deepcopy(default_cube)
-
-    count = randint(15, 25)
-    gd.scrambler_count = count
-    for _ in range(count):
-        # randomise every aspect of the turn
-        direction = bool(randint(0, 1))
-        number = randint(0, 2)
-        backwards = bool(randint(0, 1))
+logger = logging.getLogger(__name__)
 
-        turn(direction, number, backwards)
+val = ValidateScreenPositions(1600, 900)
 
 
 class Solver:
     """
-    Solve the cube, one turn per game loop
+    Solve the cube, with the moves spread over 5 seconds
 
     The solve function must be called once per game loop
     until it returns False
     to completely solve the cube
 
-    The attribute first should be updated to True before each complete solve
-
-    A solve can optionally be made to take 5 seconds. To do this, implement a
-    time.sleep(this_object.sleep_time) before the this_object.solve() call
+    The attribute first should be updated to True before each complete solve.
+    The solution is worked out from the cube state in the background,
+    so it doesn't depend on the moves list. Each move is then put on a timeline and
+    is done by the first call after it is due, so the game loop never waits.
+    If the cube is moved during the solve, a new solution is worked out.
     """
 
+    MAX_ATTEMPTS = 3
+    """The most solutions worked out for one solve before giving up
+    :type: int"""
+
     def __init__(self):
         self.first = True
         """If it is the first move of the solve
@@ -65,79 +54,115 @@ class Solver:
         self.sleep_time = 0.2
         """The amount of time to wait between each move
         :type: float"""
+        self.solution = None
+        """The moves left in the current solve, in the format stored by
+        game_data.MoveStack, None if it hasn't been worked out yet
+        :type: list[dict] or None"""
+        self.timeline = frames.Timeline()
+        """The times the moves left in the solve are due
+        :type: frames.Timeline"""
+        self.engine = hints.HintEngine(timeout=5.0)
+        """Works out the solutions in the background
+        :type: hints.HintEngine"""
+        self.state = None
+        """The state the solution is being worked out for, None if there isn't one
+        :type: facelets.FaceletState or None"""
+        self.expected = None
+        """The state the cube should be in for the next move of the solution
+        :type: facelets.FaceletState or None"""
+        self.attempts = 0
+        """The number of solutions worked out for the current solve
+        :type: int"""
 
     def solve(self):
         """
-        Does the reverse of the last done move and removes it from the moves list
+        Does the moves of the solution that are due
 
         :return: False if the cube is solved, True otherwise
         :rtype: bool
         """
-        # guard clause
-        if gd.moves.size() == 0 or self.check_solved():
-            return False
-
-        # calculate time to wait between move
         if self.first:
-            if gd.moves.size() > 0:
+            self.first = False
+            self.solution = None
+            self.attempts = 0
+            self.timeline.clear()
+
+        if self.solution is None:
+            state = gd.get_state()
+            if state != self.state:  # also if the cube was moved while searching
+                self.state = state
+                self.engine.request(state)
+            try:
+                solution = self.engine.get(state)
+            except hints.HintError as error:
+                logger.warning(error)  # the cube can't be solved from this state
+                self.state = None
+                return False
+            if solution is None:
+                return True  # still being worked out
+            # a copy, as the engine keeps the solution
+            self.solution = list(solution)
+            self.expected = state
+            self.attempts += 1
+            if len(self.solution) > 0:
                 # every solve should take 5 seconds regardless of moves required,
                 # although this can be affected by hardware limitations
-                self.sleep_time = 5 / gd.moves.size()
-                self.first = False
+                self.sleep_time = 5 / len(self.solution)
             else:
                 # wait upon every button press so the user knows it has 'worked'
                 # even when the cube is already solved
                 self.sleep_time = 1
 
-        return self.pop_move()
+            self.timeline.clear()
+            start = time.time()
+            for i in range(max(len(self.solution), 1)):
+                self.timeline.schedule(
+                    start + (i + 1) * self.sleep_time, self.next_move
+                )
 
-    @staticmethod
-    def check_solved():
+        self.timeline.run_due()
+        if len(self.timeline) > 0:
+            return True  # continue solving
+
+        self.solution = None
+        self.state = None
+        if not gd.is_solved():
+            # the cube was moved during the solve, so solve it from where it is now
+            if self.attempts < self.MAX_ATTEMPTS:
+                return True
+            logger.warning("The solver gave up, the cube kept changing")
+            return False
+
+        # the moves list no longer leads to the current state
+        gd.moves.clear()
+        return False
+
+    def next_move(self):
         """
-        Checks whether the cube is in a solved state
+        Does the next move of the solution, unless the cube has been moved since
+        the solution was worked out
 
-        :return: True if the cube is solved, False otherwise
-        :rtype: bool
+        :rtype: None
         """
-        not_solved = False
-        for i in range(6):  # face
-            for j in range(3):  # row
-                for k in range(3):  # column
-                    # checks for any square not the same colour
-                    # as the middle square on the same face
-                    # numpy.all handles it being a tuple comparison
-                    if not numpy.all(gd.used_cube[i][j][k] == gd.used_cube[i][1][1]):
-                        not_solved = True
-        # sys.exit()
-        return not not_solved
+        if gd.get_state() != self.expected:
+            self.timeline.clear()  # the rest of the solution is out of date
+            return
+        if len(self.solution) > 0:
+            # the solver's moves are not the user's, so they are not recorded
+            do_move(self.solution.pop(0))
+            self.expected = gd.get_state()
 
     @staticmethod
-    def pop_move():
+    def check_solved():
         """
-        Removes a move from the moves list and does the reverse
+        Checks whether the cube is in a solved state
 
-        :return: False if the cube is solved, True otherwise
+        :return: True if the cube is solved, False otherwise
         :rtype: bool
         """
-        # guard clause
-        if gd.moves.size() == 0:
-            return False
-
-        move = gd.moves.pop()  # get the move dictionary
-        if "rotation" in move.keys():  # check if the move was a rotation
-            # rotate does not have a backwards parameter,
-            # so achieve via 3 'forward' turns
-            for _ in range(3):
-                # ignore move as it is part of the solve, not the user or scramble
-                rotate(move["direction"], ignore_moves=True)
-        else:  # if not rotation must be turn
-            # not move["backwards"] to always undo the move
-            # ignore move as part of solve
-            turn(move["direction"], move["number"], not move["backwards"], True)
-        if gd.moves.size() == 0:  # must be solved
-            return False
-        else:
-            return True  # continue solving
+        # the number of squares not the same colour as the middle square
+        # on the same face is kept up to date by every move
+        return gd.is_solved()
 
 
 class Timer:
@@ -186,37 +211,41 @@ class Timer:
             self.elapsed = self.end - self.start_time
             gd.time_taken = self.elapsed
 
-    def display_elapsed(self):
+    def get_text(self):
         """
-        Creates a text image displaying the time elapsed
-
-        :return: The text image
-        :rtype: pygame.Surface
+        :return: the time elapsed as text
+        :rtype: str
         """
         # if time is less than a minute
         if self.elapsed < 60:  # display time as seconds and milliseconds
-            image = interface.text(
-                str(round(self.elapsed, 3)) + " seconds",  # round to milliseconds
-                gd.default_font,
-                BLACK,
-                default_colour,
-            )
+            return str(round(self.elapsed, 3)) + " seconds"  # round to milliseconds
         else:  # display time as minutes and seconds
-            image = interface.text(
+            return (
                 str(int(self.elapsed / 60))  # minutes
                 + "m "
                 + str(int(self.elapsed % 60))  # seconds
-                + "s ",
-                gd.default_font,
-                BLACK,
-                default_colour,
+                + "s "
             )
 
-        return image
+    def display_elapsed(self):
+        """
+        Creates a text image displaying the time elapsed
+
+        :return: The text image
+        :rtype: pygame.Surface
+        """
+        return interface.text(self.get_text(), default_font, BLACK, default_colour)
 
 
 class DisplayHistory:
-    """This class manages fetching and displaying the user's game history"""
+    """
+    This class manages fetching and displaying the user's game history
+
+    Only the rows that fit on the screen are drawn, so a long history doesn't slow
+    the game down. Each game is formatted once, when it is added to the history.
+    """
+
+    HEADER = "  DATE  |  STATE  |  MOVES  |  TIME  |  HINTS USED  "
 
     def __init__(self, screen, pos):
         """
@@ -231,20 +260,35 @@ class DisplayHistory:
         self.history = []
         """A 2D array where each row is a game and each column is text to display
         :type: list[list]"""
+        self.rows = []
+        """The text of each row of the history, without the header
+        :type: list[str]"""
+        self.history_source = None
+        """The game history that has been formatted, so another user's can be noticed
+        :type: list or None"""
+        self.row_images = {}
+        """The image of each row on the screen by its position, the header is 0.
+        Rows that are scrolled off the screen are removed
+        :type: dict[int, pygame.Surface]"""
 
         self.y_offset = 0
         """The amount the image should be offset vertically 
         - the amount it has been scrolled
         :type: int"""
+        self.area = interface.DirtyArea(screen, default_colour)
 
     def format_history(self):
-        """Formats the user's game history into a 2D array
-        that contains elements to be displayed"""
+        """Formats the games added to the user's game history since it was last
+        formatted into a 2D array that contains elements to be displayed"""
         history_data = ud.game_history.get_history()
-        self.history = []
-
-        for i in range(len(history_data)):  # one game
-            game = history_data[i]
+        if history_data is not self.history_source:  # a different history
+            self.history_source = history_data
+            self.history = []
+            self.rows = []
+            self.row_images = {}
+
+        # a game is only ever added to the end of the history
+        for game in history_data[len(self.history) :]:  # one game
             game_array = []
 
             # date of solve
@@ -266,63 +310,88 @@ class DisplayHistory:
             game_array.append(str(game[7]))
 
             self.history.append(game_array)
+            self.rows.append(" | ".join(game_array))
 
-    def get_image(self):
+    def get_window(self, row_height):
         """
-        Creates a text image displaying the user's game history
+        Finds the rows that are on the screen
 
-        This will get and format the user's game history before creating the image
+        :param row_height: the height of each row
+        :type row_height: int
+        :return: the position of the first row on the screen and the one after the
+            last, the header is 0
+        :rtype: tuple[int, int]
         """
-        self.format_history()
-
-        img_height = 0  # will vary on size of history
-        img_list = []  # will vary on size of history, to be added to returned surf
-
-        # header
-        img = interface.text(
-            "  DATE  |  STATE  |  MOVES  |  TIME  |  HINTS USED  ",
-            default_font,
-            BLACK,
-            default_colour,
-        )
-        img_height += img.get_height()
-        img_width = img.get_width()
-        img_list.append(img)
+        top = self.pos[1] + self.y_offset
+        first = max(0, -top // row_height)
+        # round up so a partly shown row is drawn
+        last = -(-(self.screen.get_height() - top) // row_height)
+        last = min(len(self.rows) + 1, last)
+        return first, max(first, last)
+
+    def get_image(self, first, last):
+        """
+        Creates a text image displaying some rows of the user's game history
 
-        for i in range(len(self.history)):
-            img = interface.text(
-                self.history[i][0]
-                + " | "
-                + self.history[i][1]
-                + " | "
-                + self.history[i][2]
-                + " | "
-                + self.history[i][3]
-                + " | "
-                + self.history[i][4],
-                default_font,
-                BLACK,
-                default_colour,
-            )
-            img_height += img.get_height()
-            img_list.append(img)
+        :param first: the position of the first row, the header is 0
+        :type first: int
+        :param last: the position after the last row
+        :type last: int
+        :return: the image of the rows
+        :rtype: pygame.Surface
+        """
+        header = interface.text(self.HEADER, default_font, BLACK, default_colour)
+        row_height = header.get_height()
+
+        row_images = {}
+        for i in range(first, last):
+            # rows that are still on the screen keep their image
+            if i in self.row_images:
+                row_images[i] = self.row_images[i]
+            elif i == 0:
+                row_images[i] = header
+            else:
+                row_images[i] = interface.text(
+                    self.rows[i - 1], default_font, BLACK, default_colour
+                )
+        self.row_images = row_images
 
-        surf = pygame.Surface((img_width, img_height))
+        surf = pygame.Surface((header.get_width(), (last - first) * row_height))
         surf.fill(default_colour)
-        for i in range(len(img_list)):
-            surf.blit(img_list[i], (0, i * img_list[i].get_height()))
+        for i in range(first, last):
+            surf.blit(row_images[i], (0, (i - first) * row_height))
 
         return surf
 
     def update(self):
         """
-        Updates the history image and blits it to the screen
+        Updates the history image and blits it to the screen if it has changed
 
         This takes into account the y_offset (amount scrolled) and adjusts it vertically
+
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
         """
-        img = self.get_image()
-        self.screen.blit(
-            img, [self.pos[0] - img.get_width() // 2, self.pos[1] + self.y_offset]
+        self.format_history()
+        header = interface.text(self.HEADER, default_font, BLACK, default_colour)
+        row_height = header.get_height()
+        first, last = self.get_window(row_height)
+
+        key = (
+            self.y_offset,
+            first,
+            last,
+            len(self.rows),
+            id(self.history_source),
+            self.screen.get_height(),
+        )
+        return self.area.draw(
+            key,
+            lambda: self.get_image(first, last),
+            [
+                self.pos[0] - header.get_width() // 2,
+                self.pos[1] + self.y_offset + first * row_height,
+            ],
         )
 
     def scroll(self, amount):
@@ -365,6 +434,10 @@ class Leaderboard:
 
     leaderboard_file = tools.File("leaderboard.txt", Entry)
 
+    SIZE = 10
+    """The number of entries in the leaderboard
+    :type: int"""
+
     def __init__(self, screen, pos):
         """
         :param screen: the screen that this is to be blitted to
@@ -374,12 +447,43 @@ class Leaderboard:
         """
         self.screen = screen
         self.pos = pos
+        self.area = interface.DirtyArea(screen, default_colour)
+
+        self.heap = []
+        """The top ten quickest entries as a heap of (-time, id, entry),
+        so the slowest entry is first and can be replaced quickly
+        :type: list[tuple[float, int, Entry]]"""
+        for entry in self.leaderboard_file.get_list():
+            self.push(entry)
 
-        self.entries = self.leaderboard_file.get_list()
+        self.entries = []
         """The top ten quickest solve times, should be kept in in order
         :type: list[Entry]"""
         self.sort()
 
+        self.image = None
+        """The image of the leaderboard, None if it needs to be made again
+        :type: pygame.Surface or None"""
+
+    def push(self, entry):
+        """
+        Adds an entry to the heap if it is one of the quickest, removing the slowest
+
+        :param entry: the entry to add
+        :type entry: Leaderboard.Entry
+        :return: whether the entry was added
+        :rtype: bool
+        """
+        # the id decides between equal times so entries are never compared
+        item = (-entry.time, entry.id, entry)
+        if len(self.heap) < self.SIZE:
+            heapq.heappush(self.heap, item)
+        elif entry.time < self.heap[0][2].time:
+            heapq.heapreplace(self.heap, item)
+        else:
+            return False
+        return True
+
     def update_list(self, time, moves):
         """
         Checks if the user has a leaderboard worthy time and updates the ordered list
@@ -389,30 +493,37 @@ class Leaderboard:
         :param moves: the number of moves the user did to solve the cube
         :type moves: int
         """
-        if len(self.entries) < 10:  # add new entry
-            self.entries.append(
-                Leaderboard.Entry(len(self.entries), ud.Manager.username, time, moves)
-            )
-        elif self.entries[-1].time <= time:  # if no new entry, stop
+        if len(self.heap) < self.SIZE:  # add new entry
+            entry = Leaderboard.Entry(len(self.heap), ud.Manager.username, time, moves)
+        elif self.heap[0][2].time <= time:  # if no new entry, stop
             return
-
-        elif self.entries[-1].time > time:  # if new entry replace slowest
-            self.entries[-1] = Leaderboard.Entry(
-                self.entries[-1].id, ud.Manager.username, time, moves
+        else:  # if new entry replace slowest
+            entry = Leaderboard.Entry(
+                self.heap[0][2].id, ud.Manager.username, time, moves
             )
 
+        self.push(entry)
         self.sort()
+        self.image = None  # the entries have changed
+        # sort makes a new entries list, so the file's list is never changed here
         self.leaderboard_file.replace_list(self.entries)
         self.leaderboard_file.save()
 
     def sort(self):
-        """Sorts the entries list by time"""
-        self.entries.sort(key=lambda Entry: Entry.time)
+        """Updates the entries list from the heap, ordered by time"""
+        self.entries = sorted((item[2] for item in self.heap), key=lambda e: e.time)
 
     def update(self):
-        """Updates the leaderboard image and blits it to the screen"""
-        img = self.get_image()
-        self.screen.blit(img, img.get_rect(center=self.pos))
+        """
+        Updates the leaderboard image and blits it to the screen if it has changed
+
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
+        """
+        if self.image is None:
+            self.image = self.get_image()
+        # the image is only made again when it changes, so it is its own key
+        return self.area.draw(self.image, lambda: self.image, self.pos, True)
 
     def get_image(self):
         """Creates the image of the leaderboard"""
@@ -0,0 +1,155 @@
+"""
+This file contains the frame scheduler, which paces the game loop,
+and the timeline, which runs actions at set times
+
+The game loop draws at most max_fps frames each second. When nothing is moving on the
+screen it sleeps until there is input, rather than drawing frames that don't change.
+Anything that should happen later is put on a timeline instead of sleeping, so the game
+loop never stops.
+
+black, isort and flake8 used for formatting
+"""
+
+import heapq
+import time
+from collections import deque
+
+import pygame
+
+
+class FrameScheduler:
+    """Waits between frames and measures how long each frame takes"""
+
+    def __init__(self, max_fps=60, idle_timeout=1000, history=120):
+        """
+        :param max_fps: the most frames each second
+        :type max_fps: int
+        :param idle_timeout: the most milliseconds to wait for input when idle,
+            so anything that runs on a timer still runs
+        :type idle_timeout: int
+        :param history: how many frames the statistics are measured over
+        :type history: int
+        """
+        self.max_fps = max_fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+        self.frame_times = deque(maxlen=history)
+        """The milliseconds of work done in each recent frame, not counting waiting
+        :type: deque[float]"""
+        self.frame_start = None
+        """The time the current frame started from time.perf_counter,
+        None before the first frame
+        :type: float or None"""
+
+    def next_frame(self, busy):
+        """
+        Ends the current frame and waits until the next one should start
+
+        :param busy: whether anything is moving on the screen, if not this waits
+            for input instead of drawing another frame
+        :type busy: bool
+        :return: the events since the last frame
+        :rtype: list[pygame.event.Event]
+        """
+        if self.frame_start is not None:
+            self.frame_times.append((time.perf_counter() - self.frame_start) * 1000)
+
+        if busy:
+            self.clock.tick(self.max_fps)
+            events = pygame.event.get()
+        else:
+            # sleep until there is input or the timeout passes
+            event = pygame.event.wait(self.idle_timeout)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+            # input can't make frames faster than the cap
+            self.clock.tick(self.max_fps)
+
+        self.frame_start = time.perf_counter()
+        return events
+
+    def get_fps(self):
+        """
+        :return: the frames each second, averaged over the last 10 frames
+        :rtype: float
+        """
+        return self.clock.get_fps()
+
+    def get_stats(self):
+        """
+        :return: the frames per second,
+            and the mean and longest milliseconds of work in recent frames
+        :rtype: dict[str, float]
+        """
+        if len(self.frame_times) == 0:
+            return {"fps": self.get_fps(), "mean_frame_ms": 0.0, "max_frame_ms": 0.0}
+        return {
+            "fps": self.get_fps(),
+            "mean_frame_ms": sum(self.frame_times) / len(self.frame_times),
+            "max_frame_ms": max(self.frame_times),
+        }
+
+
+class Timeline:
+    """
+    Runs actions at set times without waiting for them
+
+    The due actions are run by calling run_due once each frame, so the game loop keeps
+    drawing and handling input between them.
+    """
+
+    def __init__(self):
+        self.queue = []
+        """The actions waiting to run as a heap of (due time, order added, action)
+        :type: list[tuple[float, int, function]]"""
+        self.count = 0
+        """The number of actions ever added, keeps actions due at the same time in the
+        order they were added
+        :type: int"""
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule(self, due, action):
+        """
+        Adds an action to run at a time
+
+        :param due: the time since epoch to run the action at, from time.time
+        :type due: float
+        :param action: the function to run, it is called with no arguments
+        :type action: function
+        :rtype: None
+        """
+        heapq.heappush(self.queue, (due, self.count, action))
+        self.count += 1
+
+    def run_due(self, now=None):
+        """
+        Runs every action that is due, in order of time
+
+        :param now: the current time since epoch, defaults to time.time()
+        :type now: float or None
+        :return: the number of actions that were run
+        :rtype: int
+        """
+        if now is None:
+            now = time.time()
+        ran = 0
+        while self.queue and self.queue[0][0] <= now:
+            _, _, action = heapq.heappop(self.queue)
+            action()
+            ran += 1
+        return ran
+
+    def next_due(self):
+        """
+        :return: the time since epoch of the next action, None if there are none
+        :rtype: float or None
+        """
+        if len(self.queue) == 0:
+            return None
+        return self.queue[0][0]
+
+    def clear(self):
+        """Removes every action without running it"""
+        self.queue = []
@@ -4,15 +4,26 @@ This file contains global data and settings information
 This data is used by multiple files in the program. It may be edited here, or it may be
 provided to the user as settings for them to change.
 
+This file holds the state of the cube and how it is changed, it must not import
+pygame so the state can be used without a display, such as by solver and analysis
+workers. Settings that need pygame, such as fonts, are in data.py.
+
 black, isort and flake8 used for formatting
 """
-import copy
 
-import pygame
-from pygame import freetype
+from random import randint
 
-pygame.font.init()
-pygame.freetype.init()
+import numpy
+from facelets import FaceletState, Palette, from_nested
+from moves import (
+    AFFECTED_TABLE,
+    CENTRES,
+    IDENTITY,
+    PERMUTATION_TABLE,
+    apply,
+    get_index,
+    replay,
+)
 
 # colours
 BLACK = [0, 0, 0]
@@ -27,10 +38,23 @@ GREY = [169, 169, 169]
 default_colour = GREY
 guide_arrow_colour = BLACK
 
+# frame pacing
+max_fps = 60
+"""The most frames drawn each second
+:type: int"""
+idle_timeout = 1000
+"""The most milliseconds to wait for input when nothing is moving on the screen
+:type: int"""
+
+# saving
+autosave_interval = 5.0
+"""The fewest seconds between automatic saves of the user's data
+:type: float"""
 
-# fonts
-default_font = pygame.freetype.SysFont("calibri", 20)
-guide_font = pygame.freetype.SysFont("calibri", 20, bold=True)
+# performance
+report_stats = False
+"""Whether to print how long frames and saves took when the game is closed
+:type: bool"""
 
 
 # cube design
@@ -79,8 +103,97 @@ default_cube = [
     up,
     down,
 ]
-# deepcopy passes by value, not reference, ensuring default_cube is not changed
-used_cube = copy.deepcopy(default_cube)
+# maps the colour index of each sticker to its colour,
+# in face order so the solved cube has the face number on every sticker
+palette = Palette([ORANGE, GREEN, RED, BLUE, WHITE, YELLOW])
+# stored as a flat array of 54 colour indices for the move engine, see facelets.py
+# this creates a new array, ensuring default_cube is not changed
+used_cube = from_nested(default_cube, palette)
+"""The colour index of every sticker, it should only be changed with set_cube,
+move_cube and replay_moves
+:type: numpy.ndarray"""
+unsolved_count = 0
+"""The number of stickers that are not the colour of the middle square of their face,
+kept up to date by each move so checking for a solve costs nothing
+:type: int"""
+state_version = 0
+"""Goes up by 1 every time the cube state changes,
+so anything made from the state only needs remaking when this changes
+:type: int"""
+
+
+def _count_unsolved(positions):
+    """
+    :param positions: the indices of the stickers to check
+    :type positions: numpy.ndarray
+    :return: how many of the stickers don't match the middle square of their face
+    :rtype: int
+    """
+    return int(
+        numpy.count_nonzero(used_cube[positions] != used_cube[CENTRES[positions]])
+    )
+
+
+def set_cube(facelets):
+    """
+    Replaces the whole cube state, such as when it is loaded or reset
+
+    :param facelets: the 54 colour indices
+    :type facelets: numpy.ndarray
+    :rtype: None
+    """
+    global used_cube, unsolved_count, state_version
+    used_cube = facelets
+    unsolved_count = _count_unsolved(IDENTITY)
+    state_version += 1
+
+
+def move_cube(move):
+    """
+    Does a single move to the cube state,
+    only the stickers it affects are rechecked
+
+    :param move: a move in the format stored by MoveStack
+    :type move: dict
+    :rtype: None
+    """
+    global used_cube, unsolved_count, state_version
+    index = get_index(move)
+    affected = AFFECTED_TABLE[index]
+    unsolved_count -= _count_unsolved(affected)
+    used_cube = apply(used_cube, PERMUTATION_TABLE[index])
+    unsolved_count += _count_unsolved(affected)
+    state_version += 1
+
+
+def replay_moves(sequence):
+    """
+    Does a sequence of moves to the cube state in one step
+
+    :param sequence: the moves, see moves.compile_sequence
+    :type sequence: list[dict] or str
+    :rtype: None
+    """
+    set_cube(replay(used_cube, sequence))
+
+
+def is_solved():
+    """
+    :return: True if every face is a single colour
+    :rtype: bool
+    """
+    return unsolved_count == 0
+
+
+def get_state():
+    """
+    :return: an immutable, hashable copy of the current cube state
+    :rtype: FaceletState
+    """
+    return FaceletState(used_cube)
+
+
+set_cube(used_cube)
 
 
 # used for tracking moves and 'solving' the cube
@@ -94,6 +207,11 @@ class MoveStack:
         """
         Pushes a move onto the stack
 
+        The move is combined with the moves of the same layer on top of the stack,
+        so the stack only ever holds the net turn of each run of moves. A move and
+        its reverse cancel out, 3 turns become 1 backwards turn and 4 turns or
+        rotations are removed. A half turn is stored as 2 forward moves.
+
         :param move: move should be in the format
             {
                 "direction": True for row, False for column,
@@ -103,18 +221,60 @@ class MoveStack:
             for a turn or the following for a rotation:
             {
                 "rotation": True,
-                "direction": "x" or "y" or "z"
+                "direction": "x" or "y" or "z",
+                "backwards": optional, If the rotation was backwards
             }
         :type move: dict
         """
-        if move.keys() == {"direction", "number", "backwards"} or move.keys() == {
-            "rotation",
-            "direction",
-        }:
-            self.stack.append(move)
-        else:
+        if not (
+            move.keys() == {"direction", "number", "backwards"}
+            or move.keys() == {"rotation", "direction"}
+            or move.keys() == {"rotation", "direction", "backwards"}
+        ):
             raise ValueError("Invalid dict keys")
 
+        # count the quarter turns of the layer, a backwards move is 3 forward ones
+        layer = self._get_layer(move)
+        quarter_turns = 3 if move.get("backwards", False) else 1
+        while self.stack and self._get_layer(self.stack[-1]) == layer:
+            quarter_turns += 3 if self.stack.pop().get("backwards", False) else 1
+
+        quarter_turns %= 4
+        # new dictionaries so moves that were pushed before are never changed
+        if quarter_turns == 3:
+            self.stack.append(self._make_move(layer, True))
+        else:  # nothing is added if the moves cancel out
+            for _ in range(quarter_turns):
+                self.stack.append(self._make_move(layer, False))
+
+    @staticmethod
+    def _get_layer(move):
+        """
+        :param move: a move in the format stored by the stack
+        :type move: dict
+        :return: what the move turns, moves with the same layer can be combined
+        :rtype: tuple
+        """
+        if "rotation" in move:
+            return "rotation", move["direction"]
+        return "turn", bool(move["direction"]), move["number"]
+
+    @staticmethod
+    def _make_move(layer, backwards):
+        """
+        :param layer: what the move turns, see _get_layer
+        :type layer: tuple
+        :param backwards: whether the move is backwards
+        :type backwards: bool
+        :return: the move in the format stored by the stack
+        :rtype: dict
+        """
+        if layer[0] == "rotation":
+            if backwards:
+                return {"rotation": True, "direction": layer[1], "backwards": True}
+            return {"rotation": True, "direction": layer[1]}
+        return {"direction": layer[1], "number": layer[2], "backwards": backwards}
+
     def pop(self):
         """
         Pops a move off the stack
@@ -163,6 +323,55 @@ scrambler_count = 0
 """The amount of moves made by the scrambler
 :type: int"""
 
+
+def make_move(move, ignore_moves=False):
+    """
+    Does a move and records it in the moves list and the move count
+
+    :param move: a move in the format stored by MoveStack
+    :type move: dict
+    :param ignore_moves: don't add the move to the moves list, defaults to False.
+        Ignoring is useful for solving, the move is taken off the move count instead
+    :type ignore_moves: bool or optional
+    :rtype: None
+    """
+    global move_count
+    if not ignore_moves:
+        moves.push(move)
+        move_count += 1
+    else:
+        move_count -= 1
+    move_cube(move)
+
+
+def scramble():
+    """
+    Randomly scrambles the cube by making between 15 and 25 moves randomly
+
+    :rtype: None
+    """
+    global move_count, scrambler_count
+    # reset the cube
+    set_cube(from_nested(default_cube, palette))
+
+    count = randint(15, 25)
+    scrambler_count = count
+    sequence = []
+    for _ in range(count):
+        # randomise every aspect of the turn
+        move = {
+            "direction": bool(randint(0, 1)),
+            "number": randint(0, 2),
+            "backwards": bool(randint(0, 1)),
+        }
+        moves.push(move)
+        sequence.append(move)
+    move_count += count
+
+    # apply the whole scramble in one step
+    replay_moves(sequence)
+
+
 # used for tracking time
 start_time = 0.0
 """The time since epoch that the user started the solve/ started the scrambler
@@ -0,0 +1,163 @@
+"""
+This file contains the hint engine, which finds the best next move for the cube
+
+Hints are worked out from the cube state alone using the two-phase solver, in a
+background thread so the game loop never waits for them. Solutions are cached by
+state, and every state along a solution is cached with the rest of the solution,
+so following the hints only has to search once. If a hint can't be worked out the
+error is cached in its place, so the game can report it instead of waiting forever.
+
+black, isort and flake8 used for formatting
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import moves
+import two_phase
+from facelets import FaceletState
+
+logger = logging.getLogger(__name__)
+
+
+class HintError(Exception):
+    """This exception is raised when a hint could not be worked out for a state"""
+
+    def __init__(self, reason):
+        """
+        :param reason: why the hint could not be worked out
+        :type reason: str
+        """
+        super().__init__(f"No hint | {reason}")
+
+
+class HintEngine:
+    """Works out hints in a background thread and caches them by cube state"""
+
+    def __init__(self, cache_size=1024, timeout=2.0):
+        """
+        :param cache_size: the most states to keep solutions for
+        :type cache_size: int
+        :param timeout: the number of seconds to search for a shorter solution
+        :type timeout: float
+        """
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self.cache = OrderedDict()
+        """The rest of the solution for each state, least recently used first,
+        or the error if it could not be worked out
+        :type: OrderedDict[FaceletState, list[dict] or HintError]"""
+        self.pending = None
+        """The latest state a hint was requested for that is not being worked on yet
+        :type: FaceletState or None"""
+        self.worker = None
+        """The thread working out hints, None if it isn't running
+        :type: threading.Thread or None"""
+        self.lock = threading.Lock()
+
+    def request(self, state):
+        """
+        Starts working out the hint for a state, unless it is already cached
+
+        :param state: the state of the cube
+        :type state: FaceletState
+        :rtype: None
+        """
+        with self.lock:
+            if state in self.cache:
+                return
+            # only the latest request matters, older ones are out of date
+            self.pending = state
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._work, daemon=True)
+                self.worker.start()
+
+    def get(self, state):
+        """
+        Gets the solution for a state if it has been worked out
+
+        :param state: the state of the cube
+        :type state: FaceletState
+        :return: the moves that solve the cube in the format stored by
+            game_data.MoveStack, the hint is the first one.
+            None if it hasn't been worked out yet,
+            raises HintError if it could not be worked out
+        :rtype: list[dict] or None
+        """
+        with self.lock:
+            solution = self.cache.get(state)
+            if solution is not None:
+                self.cache.move_to_end(state)
+        if isinstance(solution, HintError):
+            raise solution
+        return solution
+
+    def _work(self):
+        """Works out hints for requested states until there are none left"""
+        try:
+            while True:
+                with self.lock:
+                    state = self.pending
+                    self.pending = None
+                    if state is None:
+                        self.worker = None
+                        return
+                try:
+                    solution = two_phase.to_moves(
+                        two_phase.solve(state, timeout=self.timeout)
+                    )
+                except two_phase.InvalidCube as error:
+                    self._store_error(state, HintError(str(error)))
+                except Exception as error:
+                    logger.exception("Working out a hint failed")
+                    self._store_error(state, HintError(repr(error)))
+                else:
+                    self._store(state, solution)
+        finally:
+            # a new thread is started for the next request even if this one failed
+            with self.lock:
+                if self.worker is threading.current_thread():
+                    self.worker = None
+
+    def _store(self, state, solution):
+        """
+        Caches a solution for its state and every state along it
+
+        :param state: the state the solution starts from
+        :type state: FaceletState
+        :param solution: the moves in the format stored by game_data.MoveStack
+        :type solution: list[dict]
+        :rtype: None
+        """
+        with self.lock:
+            for i in range(len(solution) + 1):
+                self.cache[state] = solution[i:]
+                self.cache.move_to_end(state)
+                if i < len(solution):
+                    facelets = moves.apply(
+                        state.to_array(), moves.get_permutation(solution[i])
+                    )
+                    state = FaceletState(facelets)
+            self._trim()
+
+    def _store_error(self, state, error):
+        """
+        Caches the error for a state that a hint could not be worked out for
+
+        :param state: the state of the cube
+        :type state: FaceletState
+        :param error: why the hint could not be worked out
+        :type error: HintError
+        :rtype: None
+        """
+        with self.lock:
+            self.cache[state] = error
+            self.cache.move_to_end(state)
+            self._trim()
+
+    def _trim(self):
+        """Removes the least recently used solutions, the lock must be held"""
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
@@ -8,8 +8,13 @@ DisplayOption and DisplayBar should be used together.
 black, isort and flake8 used for formatting
 """
 
+import hashlib
+import io
+import os
+from collections import OrderedDict
 
 import pygame
+import tools
 
 
 class DisplayOption:
@@ -19,7 +24,17 @@ class DisplayOption:
     This class should be used with DisplayBar
     """
 
-    def __init__(self, image_function, display_surf, pos, size, mult, action, bg_col):
+    def __init__(
+        self,
+        image_function,
+        display_surf,
+        pos,
+        size,
+        mult,
+        action,
+        bg_col,
+        key_function=None,
+    ):
         """
         :param image_function: the function to get the image to use as the button
         :param display_surf: the surface to display the button to
@@ -28,6 +43,8 @@ class DisplayOption:
         :param mult: how much to increase the image size when hovered
         :param action: the function to run when the button is clicked
         :param bg_col: the RGB value of the background colour
+        :param key_function: a function returning a value that changes whenever the
+            image from image_function changes, None if the image never changes
         :type image_function: function
         :type display_surf: pygame.Surface
         :type pos: list[int] or tuple[int, int]
@@ -35,6 +52,7 @@ class DisplayOption:
         :type mult: float
         :type action: function
         :type bg_col: tuple[int, int, int] or list[int]
+        :type key_function: function or None
         """
         self.image_function = image_function
         self.display_surf = display_surf
@@ -44,22 +62,66 @@ class DisplayOption:
         self.mult = mult
         self.act = action
         self.bg_col = bg_col
-        self.image = self.get_image()
+        self.key_function = key_function
+        self.content_key = self.get_content_key()
+        """The value from key_function when the thumbnails were made
+        :type: object"""
+        self.thumbnails = {}
+        """The scaled image of the button at each size it has been shown at,
+        these are remade when the image from image_function changes
+        :type: dict[tuple, pygame.Surface]"""
+        self.image = self.get_thumbnail(size)
 
         self.last_size = self.size
         """The last x,y size of the button. Used for checking if the button is hovered
         :type last_size: list[int]"""
+        self.draw_pos = list(pos)
+        """The top left position the button is drawn to, including its offset
+        :type: list[int]"""
+        self.key = None
+        """What the button looked like the last time it was updated,
+        changes whenever the button needs drawing again
+        :type: tuple"""
 
-    def get_image(self):
+    def get_content_key(self):
+        """
+        :return: the value from key_function, None if there isn't one
+        :rtype: object
+        """
+        if self.key_function is None:
+            return None
+        return self.key_function()
+
+    def get_thumbnail(self, size):
+        """
+        Gets the image of the button at a size, only making it if it isn't cached
+
+        :param size: the x length and y length of the button
+        :type size: list[int]
+        :return: the image of the button
+        :rtype: pygame.Surface
+        """
+        size = tuple(size)
+        if size not in self.thumbnails:
+            self.thumbnails[size] = self.get_image(size)
+        return self.thumbnails[size]
+
+    def clear_thumbnails(self):
+        """Removes the cached images, so they are made again when next shown"""
+        self.thumbnails = {}
+
+    def get_image(self, size):
         """
         Gets the image of the button in its current state
 
+        :param size: the x length and y length of the button
+        :type size: list[int]
         :return: the image of the button
         :rtype: pygame.Surface
         """
-        surf = pygame.Surface(self.size)
+        surf = pygame.Surface(size)
         cube = self.image_function()
-        cube = pygame.transform.smoothscale(cube, self.size)
+        cube = pygame.transform.smoothscale(cube, size)
         cube.set_colorkey(self.bg_col)
         surf.blit(cube, (0, 0))
         return surf
@@ -68,6 +130,9 @@ class DisplayOption:
         """
         Update the button, checking if it is hovered or clicked
 
+        The image is only remade if the image from image_function has changed,
+        the DisplayBar draws it.
+
         :param mouse_pos: the x,y position of the mouse
         :param offset: the width and height to offset the button ensures its enlarged
             size does not overlap anything
@@ -83,49 +148,42 @@ class DisplayOption:
         pos[0] = self.pos[0] + offset[0]
         pos[1] = self.pos[1] + offset[1]
 
-        # calculate the centre of the button accounting for possible enlargement
-        # and offset
-        width = self.last_size[0]
-        height = self.last_size[1]
-        centre = width // 2 + pos[0], height // 2 + pos[1]
-
-        if self.image.get_rect(center=centre).collidepoint(mouse_pos):  # if hovered
+        # the button covers its size from the last update
+        hovered = pygame.Rect(pos, self.last_size).collidepoint(mouse_pos)
+        if hovered:
             if mouse_up:  # if pressed
                 self.act()
-            # save same size so it can be restored
-            temp = self.size.copy()
             # enlarge the button
-            self.size[0], self.size[1] = (
-                self.size[0] * self.mult,
-                self.size[1] * self.mult,
-            )
+            self.last_size = [self.size[0] * self.mult, self.size[1] * self.mult]
+        else:
             self.last_size = self.size
-            # get the enlarged image
-            self.image = self.get_image()
-            # restore size to the original state so it can be displayed
-            self.size = temp
-
-            self.display_surf.blit(self.image, pos)
-            return True
-        else:  # if not hovered
-            self.image = self.get_image()
-            self.last_size = self.size
-            self.display_surf.blit(self.image, pos)
-            return False
+
+        content_key = self.get_content_key()
+        if content_key != self.content_key:  # the thumbnails are out of date
+            self.content_key = content_key
+            self.thumbnails = {}
+        self.image = self.get_thumbnail(self.last_size)
+        self.key = (tuple(pos), tuple(self.last_size), content_key)
+        self.draw_pos = pos
+        return hovered
 
 
 class DisplayBar:
     """For creating a bar of DisplayObject in a row/column"""
 
-    def __init__(self, object_list, row):
+    def __init__(self, object_list, row, bg_col):
         """
         :param object_list: list of DisplayOption in sequential order
         :param row: if the buttons are in a row(True) or column(False)
+        :param bg_col: the RGB value of the background behind the buttons
         :type object_list: list[DisplayOption]
         :type row: bool
+        :type bg_col: tuple[int, int, int] or list[int]
         """
         self.object_list = object_list
         self.row = row
+        self.bg_col = bg_col
+        self.area = DirtyArea(object_list[0].display_surf, bg_col)
 
     def update(self, mouse_pos, mouse_up):
         """
@@ -135,7 +193,8 @@ class DisplayBar:
         :param mouse_up: whether the mouse button has been clicked
         :type mouse_pos: tuple[int, int] or list[int]
         :type mouse_up: bool
-        :rtype: None
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
         """
         offset = [0, 0]
         for i in range(len(self.object_list)):
@@ -151,11 +210,274 @@ class DisplayBar:
                         self.object_list[i].last_size[1] - self.object_list[i].size[1]
                     )
 
+        # the buttons are drawn together as an enlarged button overlaps the next one
+        rects = [
+            pygame.Rect(option.draw_pos, option.image.get_size())
+            for option in self.object_list
+        ]
+        bounds = rects[0].unionall(rects[1:])
+        return self.area.draw(
+            tuple(option.key for option in self.object_list),
+            lambda: self.get_image(bounds),
+            bounds.topleft,
+        )
+
+    def clear_thumbnails(self):
+        """Removes the cached images of every button, such as when the window changes"""
+        for option in self.object_list:
+            option.clear_thumbnails()
+
+    def get_image(self, bounds):
+        """
+        :param bounds: the area of the screen the buttons cover
+        :type bounds: pygame.Rect
+        :return: the image of every button in the bar
+        :rtype: pygame.Surface
+        """
+        surf = pygame.Surface(bounds.size)
+        surf.fill(self.bg_col)
+        for option in self.object_list:
+            surf.blit(
+                option.image,
+                (option.draw_pos[0] - bounds.x, option.draw_pos[1] - bounds.y),
+            )
+        return surf
+
+
+class DirtyArea:
+    """
+    Remembers what was drawn to an area of the screen,
+    so it is only drawn again when it changes
+
+    Only the rectangles that change need updating on the display, rather than the
+    whole screen.
+    """
+
+    areas = []
+    """Every DirtyArea that has been created, so they can all be reset together
+    :type: list[DirtyArea]"""
+
+    def __init__(self, screen, bg_col):
+        """
+        :param screen: the surface the images are drawn to
+        :type screen: pygame.Surface
+        :param bg_col: the RGB value of the background, used to clear old images
+        :type bg_col: tuple[int, int, int] or list[int]
+        """
+        self.screen = screen
+        self.bg_col = bg_col
+        self.key = None
+        """A value that changes whenever the image changes, None if nothing is drawn
+        :type: object"""
+        self.rect = None
+        """The area of the screen last drawn to, None if nothing is drawn
+        :type: pygame.Rect or None"""
+        DirtyArea.areas.append(self)
+
+    def draw(self, key, image_function, pos, centre=False):
+        """
+        Draws an image if it has changed since it was last drawn,
+        clearing the old image first
+
+        :param key: a value that changes whenever the image changes
+        :type key: object
+        :param image_function: the function to get the image,
+            it is only called if the key has changed
+        :type image_function: function
+        :param pos: the top left position to draw the image to
+        :type pos: list[int] or tuple[int, int]
+        :param centre: whether pos is the centre of the image instead
+        :type centre: bool
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
+        """
+        if key is not None and key == self.key:
+            return []
+        changed = self.clear()
+        image = image_function()
+        if centre:
+            self.rect = image.get_rect(center=pos)
+        else:
+            self.rect = image.get_rect(topleft=pos)
+        self.screen.blit(image, self.rect)
+        self.key = key
+        changed.append(self.rect.clip(self.screen.get_rect()))
+        return changed
+
+    def clear(self):
+        """
+        Clears the image that was last drawn
+
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
+        """
+        if self.rect is None:
+            return []
+        self.screen.fill(self.bg_col, self.rect)
+        changed = [self.rect.clip(self.screen.get_rect())]
+        self.reset()
+        return changed
+
+    def reset(self):
+        """Forgets the image that was last drawn, such as when the screen is cleared"""
+        self.key = None
+        self.rect = None
+
+    @classmethod
+    def reset_all(cls):
+        """Forgets the images of every area, so they are all drawn again"""
+        for area in cls.areas:
+            area.reset()
+
+
+class ImageCache:
+    """
+    Keeps the most recently used images so they are only made once
+
+    When it is full the least recently used image is removed. The images are shared,
+    so they must not be changed by anything that gets them.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: the most images to keep
+        :type max_size: int
+        """
+        self.max_size = max_size
+        self.images = OrderedDict()
+        """The images by key, least recently used first
+        :type: OrderedDict[object, pygame.Surface]"""
+        self.hits = 0
+        """The number of times an image was already in the cache
+        :type: int"""
+        self.misses = 0
+        """The number of times an image had to be made
+        :type: int"""
+
+    def __len__(self):
+        return len(self.images)
+
+    def get(self, key, image_function):
+        """
+        Gets an image, making it if it isn't in the cache
+
+        :param key: a hashable value that is different for every different image
+        :type key: object
+        :param image_function: the function to make the image
+        :type image_function: function
+        :return: the image
+        :rtype: pygame.Surface
+        """
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+        self.misses += 1
+        image = image_function()
+        self.images[key] = image
+        if len(self.images) > self.max_size:
+            self.images.popitem(last=False)
+        return image
+
+    def clear(self):
+        """Removes every image, such as when a setting they depend on changes"""
+        self.images.clear()
+
+
+class AssetCache:
+    """
+    Keeps images that only depend on settings, such as the guide,
+    so they are only made once for each combination of settings
+
+    The images can also be saved as PNG files, so they are only made once ever.
+    Files that can't be read are made again.
+    """
+
+    def __init__(self, directory=None, max_size=32):
+        """
+        :param directory: the folder to save the images to,
+            None to only keep them in memory
+        :type directory: str or None
+        :param max_size: the most images to keep in memory
+        :type max_size: int
+        """
+        self.directory = directory
+        self.memory = ImageCache(max_size)
+
+    def get(self, name, settings, image_function):
+        """
+        Gets an image, loading or making it if it isn't in memory
+
+        :param name: the name of the image, used in its file name
+        :type name: str
+        :param settings: the settings the image depends on,
+            the repr must be the same every time for the same settings
+        :type settings: tuple
+        :param image_function: the function to make the image
+        :type image_function: function
+        :return: the image, it is shared so must not be changed
+        :rtype: pygame.Surface
+        """
+        return self.memory.get(
+            (name, settings), lambda: self._load(name, settings, image_function)
+        )
+
+    def get_path(self, name, settings):
+        """
+        :param name: the name of the image
+        :type name: str
+        :param settings: the settings the image depends on
+        :type settings: tuple
+        :return: the path of the image file
+        :rtype: str
+        """
+        digest = hashlib.sha1(repr(settings).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}-{digest}.png")
+
+    def _load(self, name, settings, image_function):
+        """
+        Loads the image from its file, making and saving it if it can't be loaded
+
+        :return: the image
+        :rtype: pygame.Surface
+        """
+        if self.directory is None:
+            return image_function()
+
+        path = self.get_path(name, settings)
+        tools.storage.flush(path)
+        if os.path.isfile(path):
+            try:
+                image = pygame.image.load(path)
+            except pygame.error:  # a corrupt file is made again
+                pass
+            else:
+                if pygame.display.get_surface() is not None:
+                    image = image.convert()  # optimisation
+                return image
+
+        image = image_function()
+        os.makedirs(self.directory, exist_ok=True)
+        data = io.BytesIO()
+        pygame.image.save(image, data, "png")
+        # written through the storage so a crash never leaves half a file
+        tools.storage.write(path, [data.getvalue()])
+        return image
+
+
+text_cache = ImageCache(256)
+"""The images of recently used text, see text
+:type: ImageCache"""
+
 
 def text(text, font, foreground_colour, background_colour):
     """
     Returns an image of the text
 
+    The image is kept in text_cache, so the same text is only rendered once.
+    It is shared, so it must not be changed.
+
     :param text: the text to display
     :param font: the font to use
     :param foreground_colour: the RGB value of the foreground colour
@@ -167,6 +489,25 @@ def text(text, font, foreground_colour, background_colour):
     :return: the image of the text
     :rtype: pygame.Surface
     """
+    key = (
+        text,
+        font,
+        # the font may be changed after it is made
+        font.size,
+        font.style,
+        tuple(foreground_colour),
+        tuple(background_colour),
+    )
+    return text_cache.get(
+        key, lambda: _render_text(text, font, foreground_colour, background_colour)
+    )
+
+
+def _render_text(text, font, foreground_colour, background_colour):
+    """
+    :return: the image of the text, see text
+    :rtype: pygame.Surface
+    """
     # render returns surface, rect so we only need surface
     surface, _ = font.render(
         text=text, fgcolor=foreground_colour, bgcolor=background_colour
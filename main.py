@@ -7,19 +7,26 @@ files and displays them. It also handles user input within the game loop.
 black, isort and flake8 used for formatting
 """
 
+import logging
 import sys
 import time
 
 import cube
 import features
+import frames
 import game_data  # for changing variables in data file
+import hints
 import interface
 import pygame
+import tools
 import user_data
+from data import default_font, guide_font
 from game_data import *
 from Login import login_window
 from validation import ValidateScreenPositions
 
+logger = logging.getLogger(__name__)
+
 # window
 pygame.init()
 width = 1600
@@ -54,6 +61,7 @@ class Buttons:
         1.5,
         lambda: Buttons.display_swap("3d"),
         default_colour,
+        lambda: game_data.state_version,
     )
     net_option = interface.DisplayOption(
         lambda: cube_net.get_image(),
@@ -63,6 +71,7 @@ class Buttons:
         1.5,
         lambda: Buttons.display_swap("net"),
         default_colour,
+        lambda: game_data.state_version,
     )
     guide_option = interface.DisplayOption(
         lambda: cube_guide.get_image(),
@@ -72,18 +81,14 @@ class Buttons:
         1.5,
         lambda: Buttons.display_swap("guide"),
         BLACK,
+        lambda: cube_guide.get_settings(),
     )  # should be default colour,
     # but this causes the background of the hovered button to be black.
     # May be an error with pygame.smoothscale in interface file
     # this works as a solution
 
     history_option = interface.DisplayOption(
-        lambda: interface.text(
-            "HISTORY",
-            default_font,
-            BLACK,
-            default_colour
-        ),
+        lambda: interface.text("HISTORY", default_font, BLACK, default_colour),
         screen,
         val.run([10, 300]),
         [100, 25],
@@ -93,12 +98,7 @@ class Buttons:
     )
 
     leaderboard_option = interface.DisplayOption(
-        lambda: interface.text(
-            "LEADERBOARD",
-            default_font,
-            BLACK,
-            default_colour
-        ),
+        lambda: interface.text("LEADERBOARD", default_font, BLACK, default_colour),
         screen,
         val.run([10, 325]),
         [100, 25],
@@ -110,6 +110,7 @@ class Buttons:
     cube_option_bar = interface.DisplayBar(  # update with any new options
         [cube_option, net_option, guide_option, history_option, leaderboard_option],
         False,
+        default_colour,
     )
     display_option = "3d"
 
@@ -135,9 +136,10 @@ class Buttons:
         :param mouse_up: whether the mouse button has been clicked
         :type mouse_pos: tuple[int, int] or list[int, int]
         :type mouse_up: bool
-        :rtype: None
+        :return: the rectangles of the screen that have changed
+        :rtype: list[pygame.Rect]
         """
-        Buttons.cube_option_bar.update(mouse_pos, mouse_up)
+        return Buttons.cube_option_bar.update(mouse_pos, mouse_up)
 
 
 # used for solving the cube
@@ -146,10 +148,13 @@ solve_cube = False
 :type solve_cube: bool"""
 solver = features.Solver()
 
+hint_engine = hints.HintEngine()
+hint_state = None
+"""The state of the cube when a hint was asked for, None if no hint is waiting
+:type hint_state: facelets.FaceletState or None"""
+
 timer = features.Timer()
-last_save = time.time()
-"""The timestamp of the last save, used for calculating time since last save
-:type last_save: float"""
+timer_area = interface.DirtyArea(screen, default_colour)
 
 
 # login
@@ -171,7 +176,7 @@ def load(username):
         timer.start_time = (
             time.time() - game_data.time_taken
         )  # act as if timer has just started
-    if game_data.solver_used: # solver is runnning
+    if game_data.solver_used:  # solver is runnning
         # finish solving cube
         solver.first = False
         solve_cube = True
@@ -179,17 +184,41 @@ def load(username):
 
 login_window.Window(lambda u: load(u))
 
+autosave = user_data.AutoSave(game_data.autosave_interval)
+
+frame_scheduler = frames.FrameScheduler(game_data.max_fps, game_data.idle_timeout)
+
+redraw = True
+"""If the whole screen needs drawing again, otherwise only what has changed is drawn
+:type redraw: bool"""
+shown_option = None
+"""The display option that is on the screen
+:type shown_option: str or None"""
+
 
 # game loop
 while True:
+    # frames are only needed continuously while something is moving on the screen
+    busy = redraw or solve_cube or hint_state is not None or timer.running
+    events = frame_scheduler.next_frame(busy)
+
     mouse_pos = pygame.mouse.get_pos()
     mouse_up = False
     val.update_size(pygame.display.get_surface().get_size())
 
-    for event in pygame.event.get():
+    for event in events:
         if event.type == pygame.QUIT:
+            autosave.stop()  # write any changes that haven't been saved
+            tools.storage.sync()
+            if game_data.report_stats:
+                print(f"frames: {frame_scheduler.get_stats()}")
+                print(f"storage: {tools.storage.get_stats()}")
             pygame.quit()
             sys.exit()
+        elif event.type in (pygame.VIDEORESIZE, pygame.WINDOWEXPOSED):
+            redraw = True  # the window contents may have been lost
+            if event.type == pygame.VIDEORESIZE:
+                Buttons.cube_option_bar.clear_thumbnails()
         elif event.type == pygame.MOUSEBUTTONUP:
             mouse_up = True
         elif event.type == pygame.MOUSEWHEEL and Buttons.display_option == "history":
@@ -258,21 +287,42 @@ while True:
                 game_data.time_taken = 0
                 game_data.start_time = time.time()
 
-                features.scramble()
+                game_data.scramble()
                 # prevent the timer from being started whilst the solver runs
                 # was achieved by scrambling whilst the timer ran
                 solve_cube = False
                 timer.start()  # start timer
             elif event.key == pygame.K_h:  # hint
                 game_data.hints_used = True
-                solver.pop_move()
-
-    screen.fill(default_colour)  # background colour
+                # worked out in the background so the game doesn't freeze
+                hint_state = game_data.get_state()
+                hint_engine.request(hint_state)
+
+    if hint_state is not None:  # waiting for a hint
+        try:
+            hint = hint_engine.get(hint_state)
+        except hints.HintError as error:
+            logger.warning(error)
+            hint_state = None  # stop waiting, there won't be a hint for this state
+        else:
+            if game_data.get_state() != hint_state:
+                hint_state = None  # the cube has changed so the hint is out of date
+            elif hint is not None:
+                # a rotation alone doesn't help, so it is done with the turn after it
+                for move in hint:
+                    if "rotation" in move:
+                        cube.rotate(
+                            move["direction"], backwards=move.get("backwards", False)
+                        )
+                    else:
+                        cube.turn(move["direction"], move["number"], move["backwards"])
+                        break
+                hint_state = None
 
     if solve_cube:
-        # ensures each solve take 5 sections, assuming no hardware limitations
-        time.sleep(solver.sleep_time)
-        solve_cube = solver.solve()  # solves one move
+        # the moves are spread so each solve takes 5 seconds,
+        # without stopping the game loop
+        solve_cube = solver.solve()  # does the moves that are due
     else:
         solver.first = True  # so next solve it is set to true
 
@@ -280,10 +330,15 @@ while True:
         timer.stop()
         game_data.solved = True
         user_data.game_history.add_game()
-        display_leaderboard.update_list(
-            game_data.time_taken,
-            game_data.move_count
-        )
+        display_leaderboard.update_list(game_data.time_taken, game_data.move_count)
+
+    if redraw or Buttons.display_option != shown_option:
+        # clear the screen and draw everything again
+        redraw = True
+        shown_option = Buttons.display_option
+        screen.fill(default_colour)  # background colour
+        interface.DirtyArea.reset_all()
+    changed = []  # the rectangles of the screen that have changed
 
     if Buttons.display_option == "3d":
         display_cube = cube_3d
@@ -292,50 +347,56 @@ while True:
     elif Buttons.display_option == "guide":
         # also prevents cube interact as uses default
         display_cube = cube_guide
-        # actions text
-        screen.blit(
-            interface.text(
-                text="Scramble: M",
-                font=guide_font,
-                foreground_colour=BLACK,
-                background_colour=default_colour,
-            ),
-            val.run((1100, 300)),
-        )
-        screen.blit(
-            interface.text(
-                text="Solve: K",
-                font=guide_font,
-                foreground_colour=BLACK,
-                background_colour=default_colour,
-            ),
-            val.run((1100, 350)),
-        )
-        screen.blit(
-            interface.text(
-                text="Hint: H",
-                font=guide_font,
-                foreground_colour=BLACK,
-                background_colour=default_colour,
-            ),
-            val.run((1100, 400)),
-        )
+        if redraw:  # actions text, it never changes
+            screen.blit(
+                interface.text(
+                    text="Scramble: M",
+                    font=guide_font,
+                    foreground_colour=BLACK,
+                    background_colour=default_colour,
+                ),
+                val.run((1100, 300)),
+            )
+            screen.blit(
+                interface.text(
+                    text="Solve: K",
+                    font=guide_font,
+                    foreground_colour=BLACK,
+                    background_colour=default_colour,
+                ),
+                val.run((1100, 350)),
+            )
+            screen.blit(
+                interface.text(
+                    text="Hint: H",
+                    font=guide_font,
+                    foreground_colour=BLACK,
+                    background_colour=default_colour,
+                ),
+                val.run((1100, 400)),
+            )
     elif Buttons.display_option == "history":
         display_cube = display_history
     elif Buttons.display_option == "leaderboard":
         display_cube = display_leaderboard
-    display_cube.update()  # actually update cube
+    changed += display_cube.update()  # actually update cube
 
     if timer.exists:  # display timer
-        screen.blit(timer.display_elapsed(), val.run((1400, 200)))
+        changed += timer_area.draw(
+            timer.get_text(), timer.display_elapsed, val.run((1400, 200))
+        )
         timer.update()
+    else:
+        changed += timer_area.clear()
 
     # update buttons
-    Buttons.update(mouse_pos, mouse_up)
+    changed += Buttons.update(mouse_pos, mouse_up)
 
-    # save every 5 seconds
-    if time.time() - last_save > 5:
-        time_since_save = time.time()
-        user_data.Manager.save()
+    # saved in the background, at most every autosave_interval seconds
+    autosave.update(timing=timer.running)
 
-    pygame.display.flip()
+    if redraw:
+        pygame.display.flip()
+        redraw = False
+    elif changed:
+        pygame.display.update(changed)  # only what has changed
@@ -0,0 +1,45 @@
+"""
+This file converts the save files of older versions to the current format
+
+Older versions saved each object as the repr of its dictionary, which had to be read
+with eval. Run this once to rewrite the files, they are also converted the next time
+the program saves them.
+
+usage: python migrate.py [--binary] [file ...]
+
+black, isort and flake8 used for formatting
+"""
+
+import sys
+from os.path import isfile
+
+import tools
+
+SAVE_FILES = ("saves_data.txt", "leaderboard.txt")
+"""The files the program saves to
+:type: tuple[str]"""
+
+
+def main(args):
+    """
+    Converts each file to JSON Lines, or the binary format if --binary is given
+
+    :param args: the command line arguments, excluding the program name
+    :type args: list[str]
+    :rtype: None
+    """
+    codec = tools.JsonLinesCodec
+    if "--binary" in args:
+        codec = tools.BinaryCodec
+        args = [arg for arg in args if arg != "--binary"]
+
+    for name in args or SAVE_FILES:
+        if not isfile(name):
+            print(f"{name}: not found, skipped")
+            continue
+        count = tools.migrate(name, codec)
+        print(f"{name}: {count} records written as {codec.name}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
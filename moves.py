@@ -0,0 +1,378 @@
+"""
+This file contains the move engine for the cube
+
+The cube is stored as a flat array of 54 stickers. Sticker i is on face i // 9,
+row (i % 9) // 3 and column i % 3, using the same face order as
+game_data.default_cube. Every turn and rotation is precomputed once as an index
+permutation, so a move is a single gather rather than copying every face.
+
+A permutation p is applied as new_stickers = stickers[p], so new_stickers[i] is the
+sticker that was at position p[i].
+
+Sequences of moves, either as MoveStack dictionaries or in standard cube notation,
+can be compiled into a single permutation with compile_sequence.
+
+black, isort and flake8 used for formatting
+"""
+
+from functools import lru_cache
+
+import numpy
+
+STICKER_COUNT = 54
+"""The number of stickers on the cube
+:type: int"""
+
+
+def _turn_faces(faces, row_col, number):
+    """
+    Does one forward turn of a row or column on a 6x3x3 array of faces
+
+    This is the original face-copying turn and is only used to build the tables.
+
+    :param faces: the 6x3x3 array of faces, this is not changed
+    :type faces: numpy.ndarray
+    :param row_col: row is True, column is False
+    :type row_col: bool
+    :param number: the number of the row or column, left to right or top to bottom
+    :type number: int
+    :return: the turned faces
+    :rtype: numpy.ndarray
+    """
+    new = faces.copy()
+    n = number
+
+    if row_col:  # turn the row
+        new[2][n], new[3][n], new[0][n], new[1][n] = (
+            faces[1][n],
+            faces[2][n],
+            faces[3][n],
+            faces[0][n],
+        )
+        if number == 0:  # rotate the top face
+            new[4] = numpy.rot90(faces[4], k=1, axes=(0, 1))
+        elif number == 2:  # rotate the bottom face
+            new[5] = numpy.rot90(faces[5], k=1, axes=(1, 0))
+    else:  # turn the column
+        for i in range(3):
+            new[1][i][n] = faces[5][i][n]
+            # 2-i flips the row number for the back
+            # 2 - n flips the column number for the back
+            new[5][2 - i][n] = faces[3][i][2 - n]
+            new[3][2 - i][2 - n] = faces[4][i][n]
+            new[4][i][n] = faces[1][i][n]
+
+        if number == 0:  # rotate left face
+            new[0] = numpy.rot90(faces[0], k=1, axes=(0, 1))
+        elif number == 2:  # rotate right face
+            new[2] = numpy.rot90(faces[2], k=1, axes=(1, 0))
+    return new
+
+
+def _rotate_z_faces(faces):
+    """
+    Does one z rotation on a 6x3x3 array of faces
+
+    This is the original face-copying rotation and is only used to build the tables.
+
+    :param faces: the 6x3x3 array of faces, this is not changed
+    :type faces: numpy.ndarray
+    :return: the rotated faces
+    :rtype: numpy.ndarray
+    """
+    new = faces.copy()
+    # rotate the front and back faces
+    new[1] = numpy.rot90(faces[1], k=1, axes=(1, 0))
+    new[3] = numpy.rot90(faces[3], k=1, axes=(0, 1))
+
+    # required a lot of manual testing
+    # carefully test any changes
+    for j in range(3):
+        for i in range(3):
+            new[0][j][2 - i] = faces[5][i][j]
+            new[4][j][2 - i] = faces[0][i][j]
+            new[2][j][2 - i] = faces[4][i][j]
+            new[5][j][2 - i] = faces[2][i][j]
+    return new
+
+
+def compose(*permutations):
+    """
+    Combines permutations into one that does each of them in order
+
+    :param permutations: the permutations to combine, first to last
+    :type permutations: numpy.ndarray
+    :return: the combined permutation
+    :rtype: numpy.ndarray
+    """
+    result = IDENTITY
+    for permutation in permutations:
+        # doing p then q moves the sticker at p[q[i]] to i
+        result = result[permutation]
+    return result
+
+
+def invert(permutation):
+    """
+    :param permutation: the permutation to invert
+    :type permutation: numpy.ndarray
+    :return: the permutation that undoes the given one
+    :rtype: numpy.ndarray
+    """
+    return numpy.argsort(permutation)
+
+
+IDENTITY = numpy.arange(STICKER_COUNT, dtype=numpy.intp)
+"""The permutation that leaves every sticker in place
+:type: numpy.ndarray"""
+IDENTITY.setflags(write=False)
+
+_labels = IDENTITY.reshape(6, 3, 3)
+
+TURNS = {}
+"""The permutation of every turn, keyed by (row_col, number, backwards)
+as used by cube.turn
+:type: dict[tuple[bool, int, bool], numpy.ndarray]"""
+for _row_col in (True, False):
+    for _number in range(3):
+        _forward = _turn_faces(_labels, _row_col, _number).ravel()
+        TURNS[_row_col, _number, False] = _forward
+        # 3 forward turns achieve 1 backwards turn
+        TURNS[_row_col, _number, True] = compose(_forward, _forward, _forward)
+
+ROTATIONS = {
+    # equivalent to turning every row
+    "x": compose(*(TURNS[True, i, False] for i in range(3))),
+    # equivalent to turning every column
+    "y": compose(*(TURNS[False, i, False] for i in range(3))),
+    "z": _rotate_z_faces(_labels).ravel(),
+}
+"""The permutation of every rotation, keyed by axis as used by cube.rotate
+:type: dict[str, numpy.ndarray]"""
+
+BACKWARDS_ROTATIONS = {axis: invert(ROTATIONS[axis]) for axis in ROTATIONS}
+"""The permutation of every rotation done backwards, keyed by axis
+:type: dict[str, numpy.ndarray]"""
+
+for _permutation in (
+    list(TURNS.values()) + list(ROTATIONS.values()) + list(BACKWARDS_ROTATIONS.values())
+):
+    _permutation.setflags(write=False)
+
+
+def get_permutation(move):
+    """
+    Gets the permutation for a move in the format stored by game_data.MoveStack
+
+    :param move: the move dictionary
+    :type move: dict
+    :return: the permutation of the move
+    :rtype: numpy.ndarray
+    """
+    if "rotation" in move:
+        if move.get("backwards", False):
+            return BACKWARDS_ROTATIONS[move["direction"]]
+        return ROTATIONS[move["direction"]]
+    return TURNS[bool(move["direction"]), move["number"], bool(move["backwards"])]
+
+
+MOVES = [
+    {"direction": row_col, "number": number, "backwards": backwards}
+    for (row_col, number, backwards) in TURNS
+] + [
+    move
+    for axis in ROTATIONS
+    # each rotation is followed by its backwards version
+    for move in (
+        {"rotation": True, "direction": axis},
+        {"rotation": True, "direction": axis, "backwards": True},
+    )
+]
+"""Every move in the format stored by game_data.MoveStack,
+the position of a move in this list is its move index
+:type: list[dict]"""
+
+PERMUTATION_TABLE = numpy.array(
+    [get_permutation(move) for move in MOVES], dtype=numpy.intp
+)
+"""The permutation of every move, row i is the permutation of MOVES[i]
+:type: numpy.ndarray"""
+PERMUTATION_TABLE.setflags(write=False)
+
+CENTRES = numpy.repeat(numpy.arange(6) * 9 + 4, 9)
+"""The index of the middle square of the face each sticker is on
+:type: numpy.ndarray"""
+CENTRES.setflags(write=False)
+
+
+def get_affected(permutation):
+    """
+    Finds the stickers that may change between matching and not matching the
+    middle square of their face when a permutation is applied
+
+    These are the stickers that move, and every sticker on a face whose middle
+    square moves.
+
+    :param permutation: the permutation
+    :type permutation: numpy.ndarray
+    :return: the indices of the stickers
+    :rtype: numpy.ndarray
+    """
+    moved = permutation != IDENTITY
+    return numpy.flatnonzero(moved | moved[CENTRES])
+
+
+AFFECTED_TABLE = [get_affected(permutation) for permutation in PERMUTATION_TABLE]
+"""The affected stickers of every move, see get_affected,
+item i is for MOVES[i]
+:type: list[numpy.ndarray]"""
+for _index, _move in enumerate(MOVES):
+    if "rotation" in _move:
+        # turning the whole cube takes every face and its middle square together,
+        # so no sticker changes whether it matches
+        AFFECTED_TABLE[_index] = numpy.array([], dtype=numpy.intp)
+
+
+def get_index(move):
+    """
+    Gets the move index of a move in the format stored by game_data.MoveStack
+
+    :param move: the move dictionary
+    :type move: dict
+    :return: the position of the move in MOVES
+    :rtype: int
+    """
+    if "rotation" in move:
+        # each rotation is followed by its backwards version
+        return (
+            len(TURNS)
+            + "xyz".index(move["direction"]) * 2
+            + move.get("backwards", False)
+        )
+    # TURNS is ordered by row_col (True first), then number, then backwards
+    return (not move["direction"]) * 6 + move["number"] * 2 + bool(move["backwards"])
+
+
+NOTATION = {
+    # rows turn right, the top row is U backwards and the bottom row is D
+    "U": TURNS[True, 0, True],
+    "E": TURNS[True, 1, False],
+    "D": TURNS[True, 2, False],
+    # columns turn up, the left column is L backwards and the right column is R
+    "L": TURNS[False, 0, True],
+    "M": TURNS[False, 1, True],
+    "R": TURNS[False, 2, False],
+    # a y rotation turns every row left, an x rotation turns every column up
+    "x": ROTATIONS["y"],
+    "y": invert(ROTATIONS["x"]),
+    "z": ROTATIONS["z"],
+}
+"""The permutation of each move in standard cube notation, as seen from the front
+:type: dict[str, numpy.ndarray]"""
+# the front and back layers can't be turned directly,
+# so turn them as the right layer after rotating them into its place
+NOTATION["F"] = compose(invert(NOTATION["y"]), NOTATION["R"], NOTATION["y"])
+NOTATION["B"] = compose(NOTATION["y"], NOTATION["R"], invert(NOTATION["y"]))
+NOTATION["S"] = compose(invert(NOTATION["y"]), invert(NOTATION["M"]), NOTATION["y"])
+for _permutation in NOTATION.values():
+    _permutation.setflags(write=False)
+
+
+def parse_notation(text):
+    """
+    Gets the permutation of each move written in standard cube notation
+
+    A move is a letter in NOTATION, optionally followed by ' for anticlockwise
+    or 2 for a half turn. Moves are separated by spaces, e.g. "R U R' U2"
+
+    :param text: the moves in standard notation
+    :type text: str
+    :return: the permutation of each move in order
+    :rtype: list[numpy.ndarray]
+    """
+    permutations = []
+    for token in text.split():
+        if token[0] not in NOTATION or token[1:] not in ("", "'", "2"):
+            raise ValueError(f"Invalid move: {token}")
+        permutation = NOTATION[token[0]]
+        if token[1:] == "'":
+            permutation = invert(permutation)
+        elif token[1:] == "2":
+            permutation = compose(permutation, permutation)
+        permutations.append(permutation)
+    return permutations
+
+
+@lru_cache(maxsize=1024)
+def _compile_indices(indices):
+    """
+    :param indices: the move indices of the sequence, in order
+    :type indices: tuple[int]
+    :return: the read only permutation of the whole sequence
+    :rtype: numpy.ndarray
+    """
+    permutation = compose(*PERMUTATION_TABLE[list(indices)])
+    permutation.setflags(write=False)
+    return permutation
+
+
+@lru_cache(maxsize=1024)
+def _compile_notation(text):
+    """
+    :param text: the moves in standard notation
+    :type text: str
+    :return: the read only permutation of the whole sequence
+    :rtype: numpy.ndarray
+    """
+    permutation = compose(*parse_notation(text))
+    permutation.setflags(write=False)
+    return permutation
+
+
+def compile_sequence(sequence):
+    """
+    Combines a sequence of moves into one permutation
+
+    The result is cached by sequence, so repeated algorithms, scrambles and replays
+    only have to be combined once.
+
+    :param sequence: moves in the format stored by game_data.MoveStack,
+        their indices in MOVES or a string of moves in standard notation
+    :type sequence: list[dict] or list[int] or str
+    :return: the permutation of the whole sequence
+    :rtype: numpy.ndarray
+    """
+    if isinstance(sequence, str):
+        # normalise the spacing so equal sequences share a cache entry
+        return _compile_notation(" ".join(sequence.split()))
+    return _compile_indices(
+        tuple(get_index(move) if isinstance(move, dict) else move for move in sequence)
+    )
+
+
+def replay(stickers, sequence):
+    """
+    Applies a sequence of moves in one step
+
+    :param stickers: the flat array of stickers
+    :type stickers: numpy.ndarray
+    :param sequence: the sequence of moves, see compile_sequence
+    :type sequence: list[dict] or list[int] or str
+    :return: a new array of the moved stickers
+    :rtype: numpy.ndarray
+    """
+    return apply(stickers, compile_sequence(sequence))
+
+
+def apply(stickers, permutation):
+    """
+    Applies a permutation to an array of stickers
+
+    :param stickers: the flat array of stickers, its first dimension must be 54
+    :type stickers: numpy.ndarray
+    :param permutation: the permutation to apply
+    :type permutation: numpy.ndarray
+    :return: a new array of the moved stickers
+    :rtype: numpy.ndarray
+    """
+    return stickers[permutation]
@@ -0,0 +1,162 @@
+"""
+This file contains a store for large precomputed tables
+
+The tables are kept in a single binary file with a version and a checksum. Once the
+file exists it is memory-mapped, so loading it costs almost nothing and every process
+that uses it shares the same pages. Files that are corrupt or were written for a
+different version of the tables are rebuilt automatically.
+
+File layout: the magic bytes, a 4 byte little-endian header length, a JSON header
+describing each table, then the data of each table aligned to 64 bytes.
+
+black, isort and flake8 used for formatting
+"""
+
+import json
+import os
+import struct
+import zlib
+
+import numpy
+import tools
+
+MAGIC = b"CUBETBL1"
+"""The bytes every table file starts with, changes if the layout of the file changes
+:type: bytes"""
+ALIGNMENT = 64
+"""The table data is aligned to this many bytes
+:type: int"""
+
+
+class InvalidTableFile(Exception):
+    """This exception is raised when a table file is corrupt or out of date"""
+
+    def __init__(self, path, reason):
+        """
+        :param path: the path of the table file
+        :type path: str
+        :param reason: why the file can't be used
+        :type reason: str
+        """
+        super().__init__(f"Invalid table file | File: {path} | {reason}")
+
+
+class TableStore:
+    """Saves named numpy arrays to a file and memory-maps them back"""
+
+    def __init__(self, path, version):
+        """
+        :param path: the path of the table file
+        :type path: str
+        :param version: the version of the tables, change it whenever the way they
+            are built changes so old files are rebuilt
+        :type version: int or str
+        """
+        self.path = path
+        self.version = str(version)
+
+    def save(self, tables):
+        """
+        Writes the tables to the file, replacing it in one step
+
+        :param tables: the tables by name
+        :type tables: dict[str, numpy.ndarray]
+        :rtype: None
+        """
+        entries = {}
+        offset = 0
+        for name, table in tables.items():
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT  # round up
+            entries[name] = {
+                "dtype": table.dtype.str,
+                "shape": list(table.shape),
+                "offset": offset,
+            }
+            offset += table.nbytes
+
+        checksum = 0
+        for table in tables.values():
+            checksum = zlib.crc32(numpy.ascontiguousarray(table).data, checksum)
+        header = json.dumps(
+            {"version": self.version, "checksum": checksum, "tables": entries}
+        ).encode()
+        data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        def chunks():
+            """
+            :return: the contents of the file, with zeros before each table to align it
+            :rtype: iterator[bytes]
+            """
+            position = len(MAGIC) + 4 + len(header)
+            yield MAGIC + struct.pack("<I", len(header)) + header
+            for name, table in tables.items():
+                start = data_start + entries[name]["offset"]
+                yield bytes(start - position)
+                yield numpy.ascontiguousarray(table).data
+                position = start + table.nbytes
+
+        # written through the storage so a crash never leaves half a file
+        tools.storage.write(self.path, chunks())
+
+    def load(self):
+        """
+        Memory-maps the tables from the file
+
+        :return: the read only tables by name,
+            raises InvalidTableFile if the file is corrupt or out of date
+        :rtype: dict[str, numpy.ndarray]
+        """
+        tools.storage.flush(self.path)
+        if not os.path.isfile(self.path):
+            raise InvalidTableFile(self.path, "does not exist")
+        try:
+            mapped = numpy.memmap(self.path, dtype=numpy.uint8, mode="r")
+        except ValueError:  # an empty file can't be mapped
+            raise InvalidTableFile(self.path, "empty")
+
+        start = len(MAGIC) + 4
+        if len(mapped) < start or bytes(mapped[: len(MAGIC)]) != MAGIC:
+            raise InvalidTableFile(self.path, "not a table file")
+        (header_length,) = struct.unpack("<I", bytes(mapped[len(MAGIC) : start]))
+        try:
+            header = json.loads(bytes(mapped[start : start + header_length]))
+        except ValueError:
+            raise InvalidTableFile(self.path, "unreadable header")
+        if not isinstance(header, dict) or header.get("version") != self.version:
+            raise InvalidTableFile(self.path, "out of date")
+
+        data_start = -(-(start + header_length) // ALIGNMENT) * ALIGNMENT
+        tables = {}
+        checksum = 0
+        try:
+            for name, entry in header["tables"].items():
+                dtype = numpy.dtype(entry["dtype"])
+                count = int(numpy.prod(entry["shape"]))
+                offset = data_start + entry["offset"]
+                if offset + count * dtype.itemsize > len(mapped):
+                    raise InvalidTableFile(self.path, "truncated")
+                raw = mapped[offset : offset + count * dtype.itemsize]
+                checksum = zlib.crc32(raw, checksum)
+                tables[name] = raw.view(dtype).reshape(entry["shape"])
+            expected_checksum = header["checksum"]
+        except (KeyError, TypeError, AttributeError, ValueError):
+            # the header is JSON but not a header this class wrote
+            raise InvalidTableFile(self.path, "malformed header")
+        if checksum != expected_checksum:
+            raise InvalidTableFile(self.path, "checksum does not match")
+        return tables
+
+    def get(self, build):
+        """
+        Loads the tables, building and saving them first if the file can't be used
+
+        :param build: the function that builds the tables, returning them by name
+        :type build: function
+        :return: the read only tables by name
+        :rtype: dict[str, numpy.ndarray]
+        """
+        try:
+            return self.load()
+        except InvalidTableFile:
+            self.save(build())
+        return self.load()
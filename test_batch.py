@@ -0,0 +1,60 @@
+"""
+This file tests the batched move engine
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import random
+
+import game_data as gd
+import moves
+import numpy
+from batch import CubeBatch
+from facelets import FaceletState, from_nested
+
+SOLVED = from_nested(gd.default_cube, gd.palette)
+"""The colour indices of a solved cube
+:type: numpy.ndarray"""
+
+
+def test_each_cube_matches_a_single_cube():
+    generator = random.Random(1)
+    count = 8
+    batch = CubeBatch.repeat(SOLVED, count)
+    singles = [SOLVED] * count
+    for _ in range(20):
+        indices = [generator.randrange(len(moves.MOVES)) for _ in range(count)]
+        batch.apply_each(indices)
+        singles = [
+            moves.apply(stickers, moves.PERMUTATION_TABLE[index])
+            for stickers, index in zip(singles, indices)
+        ]
+    sequence = [generator.choice(moves.MOVES) for _ in range(10)]
+    batch.apply(sequence[0])
+    batch.apply_sequence(sequence[1:])
+    for i in range(count):
+        expected = moves.replay(singles[i], sequence)
+        assert batch[i] == FaceletState(expected)
+
+
+def test_solved():
+    states = [FaceletState(SOLVED), FaceletState(moves.replay(SOLVED, "R"))]
+    batch = CubeBatch(states)
+    assert batch.solved().tolist() == [True, False]
+    batch.apply_sequence([{"rotation": True, "direction": "z"}])  # still solved
+    assert batch.solved().tolist() == [True, False]
+    batch.apply_sequence([{"direction": True, "number": 1, "backwards": False}] * 4)
+    assert batch.solved().tolist() == [True, False]
+
+
+def test_one_move_for_each_cube():
+    batch = CubeBatch.repeat(SOLVED, 3)
+    try:
+        batch.apply_each([0, 1])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("two moves were applied to three cubes")
+    assert numpy.array_equal(batch.facelets, numpy.tile(SOLVED, (3, 1)))
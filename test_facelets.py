@@ -0,0 +1,56 @@
+"""
+This file tests the compact representation of the cube's state
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import game_data as gd
+import moves
+import numpy
+from facelets import FaceletState, UnknownColour, from_nested, to_nested
+
+
+def scrambled():
+    """
+    :return: the colour indices of a scrambled cube
+    :rtype: numpy.ndarray
+    """
+    solved = from_nested(gd.default_cube, gd.palette)
+    return moves.replay(solved, "R U2 F' L D' B2 x M")
+
+
+def test_nested_round_trip():
+    facelets = scrambled()
+    cube = to_nested(facelets, gd.palette)
+    assert len(cube) == 6 and all(len(face) == 3 for face in cube)
+    assert numpy.array_equal(from_nested(cube, gd.palette), facelets)
+    solved = from_nested(gd.default_cube, gd.palette)
+    assert to_nested(solved, gd.palette) == gd.default_cube
+
+
+def test_state_is_hashable_and_immutable():
+    facelets = scrambled()
+    state = FaceletState(facelets)
+    assert state == FaceletState(facelets.copy())
+    assert {state: 1}[FaceletState.from_nested(state.to_nested(gd.palette), gd.palette)]
+    assert numpy.array_equal(state.to_array(), facelets)
+    assert not state.to_array().flags.writeable
+    try:
+        FaceletState(facelets[:53])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a state was made from 53 facelets")
+
+
+def test_unknown_colour_is_an_error():
+    cube = to_nested(scrambled(), gd.palette)
+    cube[2][1][0] = [1, 2, 3]
+    try:
+        from_nested(cube, gd.palette)
+    except UnknownColour:
+        pass
+    else:
+        raise AssertionError("a colour that isn't in the palette was converted")
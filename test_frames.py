@@ -0,0 +1,48 @@
+"""
+This file tests the frame scheduler and the timeline
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import frames
+import pygame
+
+
+def test_actions_run_in_order_when_due():
+    timeline = frames.Timeline()
+    ran = []
+    timeline.schedule(20.0, lambda: ran.append("c"))
+    timeline.schedule(10.0, lambda: ran.append("a"))
+    timeline.schedule(10.0, lambda: ran.append("b"))  # added after a
+    assert timeline.next_due() == 10.0
+
+    assert timeline.run_due(5.0) == 0
+    assert timeline.run_due(15.0) == 2
+    assert ran == ["a", "b"]
+    assert len(timeline) == 1 and timeline.next_due() == 20.0
+
+    timeline.clear()
+    assert timeline.run_due(30.0) == 0
+    assert ran == ["a", "b"] and timeline.next_due() is None
+
+
+def test_actions_can_schedule_more():
+    timeline = frames.Timeline()
+    ran = []
+    timeline.schedule(1.0, lambda: timeline.schedule(2.0, lambda: ran.append(2)))
+    # the new action is due too, so it runs in the same call
+    assert timeline.run_due(5.0) == 2
+    assert ran == [2]
+
+
+def test_frame_times_are_measured():
+    pygame.init()
+    scheduler = frames.FrameScheduler(max_fps=1000)
+    assert scheduler.get_stats()["max_frame_ms"] == 0.0
+    for _ in range(5):
+        scheduler.next_frame(True)
+    stats = scheduler.get_stats()
+    assert len(scheduler.frame_times) == 4  # the first frame has no start
+    assert 0.0 <= stats["mean_frame_ms"] <= stats["max_frame_ms"]
@@ -0,0 +1,100 @@
+"""
+This file tests the cube state in game_data
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import random
+
+import game_data as gd
+import moves
+import numpy
+from facelets import from_nested
+
+SOLVED = from_nested(gd.default_cube, gd.palette)
+"""The colour indices of a solved cube
+:type: numpy.ndarray"""
+
+
+def keep_state(monkeypatch):
+    """
+    Restores the cube state after the test
+
+    :param monkeypatch: the pytest fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    :rtype: None
+    """
+    for name in ("used_cube", "unsolved_count", "state_version"):
+        monkeypatch.setattr(gd, name, getattr(gd, name))
+
+
+def count_unsolved(facelets):
+    """
+    :param facelets: the 54 colour indices
+    :type facelets: numpy.ndarray
+    :return: the stickers that don't match the middle square of their face,
+        counted from every sticker
+    :rtype: int
+    """
+    return int(numpy.count_nonzero(facelets != facelets[moves.CENTRES]))
+
+
+def test_unsolved_count_matches_a_full_count(monkeypatch):
+    keep_state(monkeypatch)
+    generator = random.Random(2)
+    gd.set_cube(SOLVED.copy())
+    assert gd.unsolved_count == 0 and gd.is_solved()
+    for _ in range(200):
+        gd.move_cube(generator.choice(moves.MOVES))
+        assert gd.unsolved_count == count_unsolved(gd.used_cube)
+
+    gd.replay_moves("R U R' U'")
+    assert gd.unsolved_count == count_unsolved(gd.used_cube)
+    gd.set_cube(SOLVED.copy())
+    assert gd.is_solved()
+
+
+def test_merged_stack_gives_the_same_state():
+    generator = random.Random(3)
+    # few layers, so moves are often merged
+    choices = [move for move in moves.MOVES if move.get("number", 0) == 0]
+    for _ in range(20):
+        stack = gd.MoveStack()
+        pushed = [generator.choice(choices) for _ in range(40)]
+        for move in pushed:
+            stack.push(move)
+        assert numpy.array_equal(
+            moves.replay(SOLVED, stack.get_stack()), moves.replay(SOLVED, pushed)
+        )
+        assert stack.size() <= len(pushed)
+
+
+def test_moves_of_a_layer_are_merged():
+    turn = {"direction": False, "number": 2, "backwards": False}
+    back = {"direction": False, "number": 2, "backwards": True}
+    stack = gd.MoveStack()
+    stack.push(turn)
+    stack.push(back)
+    assert stack.get_stack() == []
+    for _ in range(3):
+        stack.push(turn)
+    assert stack.get_stack() == [back]
+    stack.push(back)
+    assert stack.get_stack() == [turn, turn]  # a half turn
+    stack.push(turn)
+    stack.push(turn)
+    assert stack.get_stack() == []
+
+    rotation = {"rotation": True, "direction": "y"}
+    stack.push(turn)
+    for _ in range(4):
+        stack.push(rotation)
+    assert stack.get_stack() == [turn]
+    try:
+        stack.push({"direction": True})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a move without a number was pushed")
@@ -0,0 +1,96 @@
+"""
+This file tests the hint engine
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import time
+
+import game_data as gd
+import hints
+import moves
+import two_phase
+from facelets import FaceletState, from_nested
+
+SOLVED = from_nested(gd.default_cube, gd.palette)
+"""The colour indices of a solved cube
+:type: numpy.ndarray"""
+
+
+def wait_for(engine, state, timeout=30.0):
+    """
+    Waits for the hint for a state to be worked out
+
+    :param engine: the engine the hint was requested from
+    :type engine: hints.HintEngine
+    :param state: the state the hint was requested for
+    :type state: FaceletState
+    :param timeout: the most seconds to wait
+    :type timeout: float
+    :return: the solution, raises HintError if it could not be worked out
+    :rtype: list[dict]
+    """
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        solution = engine.get(state)
+        if solution is not None:
+            return solution
+        time.sleep(0.01)
+    raise AssertionError("the hint was not worked out in time")
+
+
+def test_following_the_hints_solves_the_cube():
+    state = FaceletState(moves.replay(SOLVED, "R U F' L2 D B' R2 U'"))
+    engine = hints.HintEngine()
+    engine.request(state)
+    solution = wait_for(engine, state)
+
+    facelets = state.to_array()
+    for move in solution:
+        facelets = moves.apply(facelets, moves.get_permutation(move))
+        # every state along the solution is cached with the rest of it
+        assert engine.get(FaceletState(facelets)) is not None
+    assert engine.get(FaceletState(facelets)) == []
+    assert (facelets == facelets[moves.CENTRES]).all()
+
+
+def test_invalid_state_is_an_error():
+    facelets = SOLVED.copy()
+    facelets[0] = facelets[9]  # one colour now has 10 stickers
+    state = FaceletState(facelets)
+    engine = hints.HintEngine()
+    engine.request(state)
+    try:
+        wait_for(engine, state)
+    except hints.HintError:
+        pass
+    else:
+        raise AssertionError("a hint was found for an invalid cube")
+
+
+def test_engine_recovers_after_a_crash(monkeypatch):
+    solve = two_phase.solve
+    calls = []
+
+    def crash_once(*args, **kwargs):
+        calls.append(True)
+        if len(calls) == 1:
+            raise RuntimeError("crash")
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(two_phase, "solve", crash_once)
+    engine = hints.HintEngine()
+    first = FaceletState(moves.replay(SOLVED, "R U"))
+    engine.request(first)
+    try:
+        wait_for(engine, first)
+    except hints.HintError:
+        pass
+    else:
+        raise AssertionError("the crash was not reported")
+
+    second = FaceletState(moves.replay(SOLVED, "F D'"))
+    engine.request(second)
+    assert len(wait_for(engine, second)) > 0
@@ -0,0 +1,89 @@
+"""
+This file tests the journaled mode of tools.File
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import os
+
+import tools
+
+
+class Record:
+    """A record with an identifier, a value and a list that grows"""
+
+    def __init__(self, name=None, score=0, history=None):
+        self.name = name
+        self.score = score
+        self.history = history if history is not None else []
+
+
+def get_values(file):
+    """
+    :param file: the file to get the objects of
+    :type file: tools.File
+    :return: the values of each object by identifier
+    :rtype: dict[str, tuple]
+    """
+    return {obj.name: (obj.score, obj.history) for obj in file.list}
+
+
+def test_journal_replays_changes(tmp_path):
+    name = str(tmp_path / "saves.txt")
+    file = tools.File(name, Record, journal=True)
+    file.add_object(Record("bob", 1, [[1]]))
+    file.add_object(Record("amy", 2))
+    file.save()
+    bob = file.get_object("bob")
+    bob.score = 5
+    bob.history.append([2])
+    file.update_object("bob", bob)
+    file.remove_object("amy")
+    file.save()
+
+    assert os.path.getsize(name) == 0  # only the journal has been written
+    assert get_values(tools.File(name, Record, journal=True)) == {
+        "bob": (5, [[1], [2]])
+    }
+
+
+def test_truncated_last_journal_line_is_ignored(tmp_path):
+    name = str(tmp_path / "saves.txt")
+    file = tools.File(name, Record, journal=True)
+    file.add_object(Record("bob", 1))
+    file.save()
+    with open(file.journal_name, "ab") as f:
+        f.write(b'{"id":"bob","set":{"sco')  # stopped part way through a save
+
+    file = tools.File(name, Record, journal=True)
+    assert get_values(file) == {"bob": (1, [])}
+    # new changes start on a line of their own
+    file.get_object("bob").score = 2
+    file.update_object("bob", file.get_object("bob"))
+    file.save()
+    assert get_values(tools.File(name, Record, journal=True)) == {"bob": (2, [])}
+
+
+def test_compaction_is_finished_after_a_restart(tmp_path):
+    name = str(tmp_path / "saves.txt")
+    file = tools.File(name, Record, journal=True)
+    file.add_object(Record("bob", 1, [[1]]))
+    file.save()
+    bob = file.get_object("bob")
+    bob.history.append([2])
+    file.update_object("bob", bob)
+    file.save()
+    with open(file.journal_name, "rb") as f:
+        journal = f.read()
+
+    # stop after the new file was written but before the old journal was removed
+    file.compact()
+    with open(file.old_journal_name, "wb") as f:
+        f.write(journal)
+
+    file = tools.File(name, Record, journal=True)
+    # replaying the old journal again doesn't add the history twice
+    assert get_values(file) == {"bob": (1, [[1], [2]])}
+    assert not os.path.isfile(file.old_journal_name)
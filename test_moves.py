@@ -0,0 +1,171 @@
+"""
+This file tests the move engine
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import copy
+import random
+
+import moves
+import numpy
+
+
+def reference_turn(cube, row_col, number):
+    """
+    Does one forward turn the way the game did before the move engine
+
+    :param cube: the 6x3x3 nested list of stickers, changed in place
+    :type cube: list
+    :param row_col: row is True, column is False
+    :type row_col: bool
+    :param number: the number of the row or column
+    :type number: int
+    :rtype: None
+    """
+    faces = copy.deepcopy(cube)
+    n = number
+    if row_col:
+        cube[2][n], cube[3][n], cube[0][n], cube[1][n] = (
+            faces[1][n],
+            faces[2][n],
+            faces[3][n],
+            faces[0][n],
+        )
+        if number == 0:
+            cube[4] = numpy.rot90(cube[4], k=1, axes=(0, 1)).tolist()
+        elif number == 2:
+            cube[5] = numpy.rot90(cube[5], k=1, axes=(1, 0)).tolist()
+    else:
+        for i in range(3):
+            cube[1][i][n] = faces[5][i][n]
+            cube[5][2 - i][n] = faces[3][i][2 - n]
+            cube[3][2 - i][2 - n] = faces[4][i][n]
+            cube[4][i][n] = faces[1][i][n]
+        if number == 0:
+            cube[0] = numpy.rot90(cube[0], k=1, axes=(0, 1)).tolist()
+        elif number == 2:
+            cube[2] = numpy.rot90(cube[2], k=1, axes=(1, 0)).tolist()
+
+
+def reference_rotate(cube, axis):
+    """
+    Does one rotation the way the game did before the move engine
+
+    :param cube: the 6x3x3 nested list of stickers, changed in place
+    :type cube: list
+    :param axis: x, y or z
+    :type axis: str
+    :rtype: None
+    """
+    faces = copy.deepcopy(cube)
+    if axis == "x":
+        for i in range(3):
+            reference_turn(cube, True, i)
+    elif axis == "y":
+        for i in range(3):
+            reference_turn(cube, False, i)
+    else:
+        cube[1] = numpy.rot90(cube[1], k=1, axes=(1, 0)).tolist()
+        cube[3] = numpy.rot90(cube[3], k=1, axes=(0, 1)).tolist()
+        for j in range(3):
+            for i in range(3):
+                cube[0][j][2 - i] = faces[5][i][j]
+                cube[4][j][2 - i] = faces[0][i][j]
+                cube[2][j][2 - i] = faces[4][i][j]
+                cube[5][j][2 - i] = faces[2][i][j]
+
+
+def reference_move(cube, move):
+    """
+    Does a move in the format stored by game_data.MoveStack with the reference
+
+    :param cube: the 6x3x3 nested list of stickers, changed in place
+    :type cube: list
+    :param move: the move
+    :type move: dict
+    :rtype: None
+    """
+    # backwards moves were done as 3 forward ones
+    for _ in range(3 if move.get("backwards", False) else 1):
+        if "rotation" in move:
+            reference_rotate(cube, move["direction"])
+        else:
+            reference_turn(cube, move["direction"], move["number"])
+
+
+def random_moves(count, seed):
+    """
+    :param count: the number of moves
+    :type count: int
+    :param seed: the seed for the random choices
+    :type seed: int
+    :return: random moves in the format stored by game_data.MoveStack
+    :rtype: list[dict]
+    """
+    generator = random.Random(seed)
+    return [generator.choice(moves.MOVES) for _ in range(count)]
+
+
+def test_every_move_matches_the_reference():
+    for move in moves.MOVES:
+        cube = moves.IDENTITY.reshape(6, 3, 3).tolist()
+        reference_move(cube, move)
+        stickers = moves.apply(moves.IDENTITY, moves.get_permutation(move))
+        assert stickers.tolist() == numpy.ravel(cube).tolist(), move
+        assert moves.MOVES[moves.get_index(move)] == move
+
+
+def test_random_sequences_match_the_reference():
+    for seed in range(20):
+        cube = moves.IDENTITY.reshape(6, 3, 3).tolist()
+        stickers = moves.IDENTITY
+        for move in random_moves(30, seed):
+            reference_move(cube, move)
+            stickers = moves.apply(stickers, moves.get_permutation(move))
+        assert stickers.tolist() == numpy.ravel(cube).tolist()
+
+
+def test_compiled_sequence_matches_each_move():
+    stickers = numpy.arange(moves.STICKER_COUNT)
+    for seed in range(20):
+        sequence = random_moves(25, seed)
+        expected = stickers
+        for move in sequence:
+            expected = moves.apply(expected, moves.get_permutation(move))
+        assert numpy.array_equal(moves.replay(stickers, sequence), expected)
+        # move indices give the same permutation
+        indices = [moves.get_index(move) for move in sequence]
+        assert numpy.array_equal(moves.compile_sequence(indices), expected)
+
+
+def test_compiled_notation_matches_each_move():
+    stickers = numpy.arange(moves.STICKER_COUNT)
+    text = "R U R' U' x M2 y' F2 S z' E B' D L2"
+    expected = stickers
+    for permutation in moves.parse_notation(text):
+        expected = moves.apply(expected, permutation)
+    assert numpy.array_equal(moves.replay(stickers, text), expected)
+    # the spacing doesn't matter
+    assert numpy.array_equal(
+        moves.replay(stickers, "  " + text.replace(" ", "   ")), expected
+    )
+
+
+def test_notation_inverses():
+    for letter in moves.NOTATION:
+        # a move then its inverse, and four quarter turns, do nothing
+        for text in (f"{letter} {letter}'", f"{letter}2 {letter}2", f"{letter} " * 4):
+            assert numpy.array_equal(moves.compile_sequence(text), moves.IDENTITY)
+
+
+def test_invalid_notation_is_an_error():
+    for text in ("R3", "Q", "R''"):
+        try:
+            moves.compile_sequence(text)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{text} was compiled")
@@ -0,0 +1,109 @@
+"""
+This file tests the store for the solver's precomputed tables
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import json
+import struct
+
+import numpy
+import table_store
+import tools
+from table_store import InvalidTableFile, TableStore
+
+
+def make_tables():
+    """
+    :return: small tables of different types and shapes
+    :rtype: dict[str, numpy.ndarray]
+    """
+    return {
+        "moves": numpy.arange(60, dtype=numpy.uint16).reshape(6, 10),
+        "depths": numpy.arange(7, dtype=numpy.int8),
+    }
+
+
+def check_tables(tables):
+    """
+    :param tables: the tables loaded from a file
+    :type tables: dict[str, numpy.ndarray]
+    :rtype: None
+    """
+    for name, expected in make_tables().items():
+        assert tables[name].dtype == expected.dtype
+        assert numpy.array_equal(tables[name], expected)
+
+
+def write_header(path, header):
+    """
+    Writes a table file with the given header and no data
+
+    :param path: the path of the file
+    :type path: str
+    :param header: the header, written as JSON
+    :type header: object
+    :rtype: None
+    """
+    data = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(table_store.MAGIC + struct.pack("<I", len(data)) + data)
+
+
+def test_tables_round_trip(tmp_path):
+    store = TableStore(str(tmp_path / "tables.bin"), 1)
+    store.save(make_tables())
+    check_tables(store.load())
+
+
+def test_out_of_date_file_is_rebuilt(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    TableStore(path, 1).save({"old": numpy.zeros(3, dtype=numpy.uint8)})
+    builds = []
+
+    def build():
+        builds.append(True)
+        return make_tables()
+
+    check_tables(TableStore(path, 2).get(build))
+    assert len(builds) == 1
+    check_tables(TableStore(path, 2).get(build))  # now loaded from the file
+    assert len(builds) == 1
+
+
+def test_malformed_headers_are_invalid(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    store = TableStore(path, 1)
+    for header in (
+        [],
+        {"version": "1"},
+        {"version": "1", "tables": []},
+        {"version": "1", "tables": {"moves": {"dtype": "<u2"}}, "checksum": 0},
+        {"version": "1", "tables": {}},
+    ):
+        write_header(path, header)
+        try:
+            store.load()
+        except InvalidTableFile:
+            pass
+        else:
+            raise AssertionError(f"{header} was loaded")
+    # get rebuilds the file instead of failing
+    check_tables(store.get(make_tables))
+
+
+def test_truncated_file_is_invalid(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    store = TableStore(path, 1)
+    store.save(make_tables())
+    tools.storage.flush(path)
+    with open(path, "rb+") as f:
+        f.truncate(100)
+    try:
+        store.load()
+    except InvalidTableFile:
+        pass
+    else:
+        raise AssertionError("the truncated file was loaded")
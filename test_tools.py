@@ -0,0 +1,117 @@
+"""
+This file tests the record formats of tools.File
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import os
+
+import tools
+
+
+class Record:
+    """A record with an identifier, a value and a list that grows"""
+
+    def __init__(self, name=None, score=0, history=None):
+        self.name = name
+        self.score = score
+        self.history = history if history is not None else []
+
+
+def get_values(file):
+    """
+    :param file: the file to get the objects of
+    :type file: tools.File
+    :return: the values of each object by identifier
+    :rtype: dict[str, tuple]
+    """
+    return {obj.name: (obj.score, obj.history) for obj in file.list}
+
+
+def test_legacy_file_is_read_and_saved_as_json_lines(tmp_path):
+    name = str(tmp_path / "saves.txt")
+    with open(name, "w") as f:
+        f.write(str({"name": "bob", "score": 3, "history": [[1, (2, 3)]]}) + "\n")
+        f.write(str({"name": "amy", "score": 1.5, "history": []}) + "\n")
+    assert tools.detect_codec(name) is tools.LegacyCodec
+
+    file = tools.File(name, Record)
+    assert get_values(file) == {"bob": (3, [[1, (2, 3)]]), "amy": (1.5, [])}
+
+    file.save()
+    assert tools.detect_codec(name) is tools.JsonLinesCodec
+    # tuples are read back as lists
+    assert get_values(tools.File(name, Record)) == {
+        "amy": (1.5, []),
+        "bob": (3, [[1, [2, 3]]]),
+    }
+
+
+def test_binary_round_trip(tmp_path):
+    name = str(tmp_path / "records.bin")
+    record = {
+        "none": None,
+        "bools": [True, False],
+        "ints": [0, 127, 128, -1, -32, -33, 2**40, -(2**40)],
+        "float": 0.25,
+        "strings": ["", "short", "x" * 40, "café"],
+        "long list": list(range(20)),
+        "map": {str(i): i for i in range(20)},
+    }
+    tools.write_records(name, [record, {}], tools.BinaryCodec)
+    assert tools.detect_codec(name) is tools.BinaryCodec
+    assert list(tools.read_records(name)) == [record, {}]
+
+
+def test_truncated_binary_file_is_an_error(tmp_path):
+    name = str(tmp_path / "records.bin")
+    tools.write_records(name, [{"name": "bob"}], tools.BinaryCodec)
+    tools.storage.flush(name)
+    with open(name, "rb+") as f:
+        f.truncate(os.path.getsize(name) - 2)
+    try:
+        list(tools.read_records(name))
+    except tools.InvalidRecord:
+        pass
+    else:
+        raise AssertionError("the truncated record was read")
+
+
+def test_writes_are_committed_together(tmp_path):
+    storage = tools.Storage(sync_interval=60)
+    name = str(tmp_path / "file.txt")
+    storage.write(name, [b"old"])
+    storage.sync()
+    for i in range(5):
+        storage.write(name, [b"new %d" % i])
+    # the old version is kept until the file is committed
+    with open(name, "rb") as f:
+        assert f.read() == b"old"
+    storage.flush(name)
+    with open(name, "rb") as f:
+        assert f.read() == b"new 4"
+    assert storage.get_stats()["writes"] == 6
+    assert storage.get_stats()["commits"] == 2
+    storage.sync()
+    assert storage.timer is None
+
+
+def test_failed_write_keeps_the_last_version(tmp_path):
+    storage = tools.Storage(sync_interval=60)
+    name = str(tmp_path / "file.txt")
+    storage.write(name, [b"saved"])
+
+    def chunks():
+        yield b"half"
+        raise RuntimeError("failed")
+
+    try:
+        storage.write(name, chunks())
+    except RuntimeError:
+        pass
+    storage.sync()
+    with open(name, "rb") as f:
+        assert f.read() == b"saved"
+    assert not os.path.isfile(name + ".tmp.part")
@@ -0,0 +1,72 @@
+"""
+This file tests the two-phase solver
+
+The tables are built the first time this runs, which takes a few seconds.
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import random
+
+import game_data as gd
+import moves
+import two_phase
+from facelets import from_nested
+
+SOLVED = from_nested(gd.default_cube, gd.palette)
+"""The colour indices of a solved cube
+:type: numpy.ndarray"""
+
+
+def is_solved(facelets):
+    """
+    :param facelets: the 54 colour indices
+    :type facelets: numpy.ndarray
+    :return: whether every face is the colour of its middle square
+    :rtype: bool
+    """
+    return bool((facelets == facelets[moves.CENTRES]).all())
+
+
+def scramble(seed):
+    """
+    :param seed: the seed for the random moves
+    :type seed: int
+    :return: the colour indices of a cube scrambled with turns and rotations
+    :rtype: numpy.ndarray
+    """
+    generator = random.Random(seed)
+    return moves.replay(SOLVED, [generator.choice(moves.MOVES) for _ in range(30)])
+
+
+def test_random_scrambles_are_solved():
+    for seed in range(10):
+        facelets = scramble(seed)
+        solution = two_phase.solve(facelets)
+        assert len(solution) <= 22
+        assert is_solved(moves.replay(facelets, " ".join(solution)))
+
+        # the game's moves solve it too
+        for move in two_phase.to_moves(solution):
+            facelets = moves.apply(facelets, moves.get_permutation(move))
+        assert is_solved(facelets)
+
+
+def test_solved_cube_needs_no_moves():
+    assert two_phase.solve(SOLVED) == []
+    assert two_phase.to_moves([]) == []
+
+
+def test_impossible_states_are_invalid():
+    facelets = scramble(0)
+    for first, second in ((0, 9), (1, 10), (4, 13)):
+        changed = facelets.copy()
+        changed[first], changed[second] = facelets[second], facelets[first]
+        try:
+            two_phase.solve(changed)
+        except two_phase.InvalidCube:
+            pass
+        else:
+            raise AssertionError(f"swapping {first} and {second} was solved")
@@ -0,0 +1,101 @@
+"""
+This file tests saving the user's data in the background
+
+Run with pytest.
+
+black, isort and flake8 used for formatting
+"""
+
+import game_data as gd
+import user_data
+from user_data import AutoSave, Manager
+
+
+def record_writes(monkeypatch, fail=0):
+    """
+    Replaces writing to the file with recording each snapshot
+
+    :param monkeypatch: the pytest fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    :param fail: the number of writes that fail first
+    :type fail: int
+    :return: the snapshots written, in order
+    :rtype: list[user_data.User]
+    """
+    written = []
+    failures = [fail]
+
+    def write(user):
+        if failures[0] > 0:
+            failures[0] -= 1
+            raise OSError("disk full")
+        written.append(user)
+
+    monkeypatch.setattr(Manager, "username", "bob")
+    monkeypatch.setattr(Manager, "write", staticmethod(write))
+    monkeypatch.setattr(gd, "move_count", 0)
+    monkeypatch.setattr(gd, "time_taken", 0.0)
+    return written
+
+
+def wait(autosave):
+    """
+    Waits for the snapshots handed to the thread to be written
+
+    :param autosave: the autosave to wait for
+    :type autosave: AutoSave
+    :rtype: None
+    """
+    worker = autosave.worker
+    if worker is not None:
+        worker.join()
+
+
+def test_changes_are_saved_together(monkeypatch):
+    written = record_writes(monkeypatch)
+    autosave = AutoSave(interval=5.0)
+    start = autosave.last_save
+
+    gd.move_count = 1
+    autosave.update(start + 1)  # too soon after the last save
+    gd.move_count = 2
+    autosave.update(start + 6)
+    autosave.update(start + 12)  # nothing has changed
+    autosave.stop()
+    assert [user.move_count for user in written] == [2]
+
+
+def test_time_is_saved_when_the_timer_stops(monkeypatch):
+    written = record_writes(monkeypatch)
+    autosave = AutoSave(interval=5.0)
+    start = autosave.last_save
+
+    gd.move_count = 1
+    autosave.update(start + 6, timing=True)
+    wait(autosave)
+    gd.time_taken = 3.0
+    autosave.update(start + 12, timing=True)  # only the time has changed
+    wait(autosave)
+    assert [user.time_taken for user in written] == [0.0]
+
+    autosave.update(start + 18, timing=False)
+    wait(autosave)
+    assert [user.time_taken for user in written] == [0.0, 3.0]
+
+
+def test_saving_carries_on_after_a_failure(monkeypatch):
+    written = record_writes(monkeypatch, fail=1)
+    autosave = AutoSave(interval=5.0)
+    start = autosave.last_save
+
+    gd.move_count = 1
+    autosave.update(start + 6)
+    autosave.stop()
+    assert written == []
+    assert autosave.worker is None
+
+    gd.move_count = 2
+    autosave.update(start + 12)
+    autosave.stop()
+    assert [user.move_count for user in written] == [2]
+    assert isinstance(written[0], user_data.User)
@@ -6,6 +6,15 @@ As this file has been designed to work with any program all its functions are ge
 black, isort and flake8 used for formatting
 """
 
+import ast
+import atexit
+import copy
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
 from os.path import isfile
 
 
@@ -22,6 +31,686 @@ class ObjectNotFound(Exception):
         super().__init__(f"Object not found | Identifier: {identifier} | File: {file}")
 
 
+class InvalidRecord(Exception):
+    """Indicates that a record in a file could not be read"""
+
+    def __init__(self, file, reason):
+        """
+        :param file: the file that was read
+        :type file: str
+        :param reason: why the record could not be read
+        :type reason: str
+        """
+        super().__init__(f"Invalid record | File: {file} | {reason}")
+
+
+class JsonLinesCodec:
+    """
+    Stores each record as a line of JSON
+
+    The values of a record must be None, bool, int, float, str, list or dict with
+    str keys. Tuples are read back as lists.
+    """
+
+    name = "jsonl"
+
+    @staticmethod
+    def matches(start):
+        """
+        :param start: the first bytes of a file that isn't empty
+        :type start: bytes
+        :return: whether the file is in this format
+        :rtype: bool
+        """
+        # records are objects and JSON keys are always in double quotes
+        return start.lstrip().startswith((b'{"', b"{}"))
+
+    @staticmethod
+    def encode(records):
+        """
+        :param records: the records to write
+        :type records: iterable[dict]
+        :return: the bytes of each record
+        :rtype: iterator[bytes]
+        """
+        for record in records:
+            yield json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+    @staticmethod
+    def decode(f, name):
+        """
+        Reads the records one at a time
+
+        :param f: the file, opened in binary mode
+        :type f: io.BufferedReader
+        :param name: the name of the file, for errors
+        :type name: str
+        :return: each record
+        :rtype: iterator[dict]
+        """
+        for line in f:
+            if line.strip() == b"":
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise InvalidRecord(name, str(error))
+
+
+class BinaryCodec:
+    """
+    Stores each record as its length followed by the record in MessagePack format
+
+    This is more compact and quicker to read than JSON Lines. The file starts with
+    MAGIC so it can be recognised. The same values as JsonLinesCodec are supported.
+    """
+
+    name = "binary"
+    MAGIC = b"RECORDS1"
+
+    @classmethod
+    def matches(cls, start):
+        """
+        :param start: the first bytes of a file that isn't empty
+        :type start: bytes
+        :return: whether the file is in this format
+        :rtype: bool
+        """
+        return start.startswith(cls.MAGIC)
+
+    @classmethod
+    def encode(cls, records):
+        """
+        :param records: the records to write
+        :type records: iterable[dict]
+        :return: the bytes of each record, after the magic bytes
+        :rtype: iterator[bytes]
+        """
+        yield cls.MAGIC
+        for record in records:
+            parts = []
+            cls.pack(record, parts)
+            data = b"".join(parts)
+            yield struct.pack("<I", len(data)) + data
+
+    @classmethod
+    def decode(cls, f, name):
+        """
+        Reads the records one at a time
+
+        :param f: the file, opened in binary mode
+        :type f: io.BufferedReader
+        :param name: the name of the file, for errors
+        :type name: str
+        :return: each record
+        :rtype: iterator[dict]
+        """
+        if f.read(len(cls.MAGIC)) != cls.MAGIC:
+            raise InvalidRecord(name, "not a binary record file")
+        while True:
+            length = f.read(4)
+            if length == b"":
+                return
+            if len(length) < 4:
+                raise InvalidRecord(name, "truncated")
+            size = struct.unpack("<I", length)[0]
+            data = f.read(size)
+            if len(data) < size:
+                raise InvalidRecord(name, "truncated")
+            try:
+                record, end = cls.unpack(data, 0)
+            except (IndexError, struct.error, UnicodeDecodeError, ValueError):
+                raise InvalidRecord(name, "truncated or corrupt record")
+            if end != len(data):
+                raise InvalidRecord(name, "corrupt record")
+            yield record
+
+    @classmethod
+    def pack(cls, value, parts):
+        """
+        Adds the MessagePack bytes of a value to a list
+
+        :param value: the value
+        :type value: None or bool or int or float or str or list or tuple or dict
+        :param parts: the list of bytes to add to
+        :type parts: list[bytes]
+        :rtype: None
+        """
+        # bool must be checked before int as it is a subclass
+        if value is None:
+            parts.append(b"\xc0")
+        elif value is True:
+            parts.append(b"\xc3")
+        elif value is False:
+            parts.append(b"\xc2")
+        elif isinstance(value, int):
+            if 0 <= value < 128:  # positive fixint
+                parts.append(bytes((value,)))
+            elif -32 <= value < 0:  # negative fixint
+                parts.append(struct.pack(">b", value))
+            else:
+                parts.append(b"\xd3" + struct.pack(">q", value))
+        elif isinstance(value, float):
+            parts.append(b"\xcb" + struct.pack(">d", value))
+        elif isinstance(value, str):
+            data = value.encode()
+            if len(data) < 32:  # fixstr
+                parts.append(bytes((0xA0 | len(data),)) + data)
+            else:
+                parts.append(b"\xdb" + struct.pack(">I", len(data)) + data)
+        elif isinstance(value, (list, tuple)):
+            if len(value) < 16:  # fixarray
+                parts.append(bytes((0x90 | len(value),)))
+            else:
+                parts.append(b"\xdd" + struct.pack(">I", len(value)))
+            for item in value:
+                cls.pack(item, parts)
+        elif isinstance(value, dict):
+            if len(value) < 16:  # fixmap
+                parts.append(bytes((0x80 | len(value),)))
+            else:
+                parts.append(b"\xdf" + struct.pack(">I", len(value)))
+            for key, item in value.items():
+                cls.pack(key, parts)
+                cls.pack(item, parts)
+        else:
+            raise TypeError(f"Can't store {type(value).__name__} in a record")
+
+    @classmethod
+    def unpack(cls, data, pos):
+        """
+        Reads a value written by pack
+
+        :param data: the bytes to read from
+        :type data: bytes
+        :param pos: the position of the value
+        :type pos: int
+        :return: the value and the position after it
+        :rtype: tuple[object, int]
+        """
+        tag = data[pos]
+        pos += 1
+        if tag < 0x80:  # positive fixint
+            return tag, pos
+        if tag >= 0xE0:  # negative fixint
+            return tag - 0x100, pos
+        if tag == 0xC0:
+            return None, pos
+        if tag == 0xC2:
+            return False, pos
+        if tag == 0xC3:
+            return True, pos
+        if tag == 0xD3:
+            return struct.unpack_from(">q", data, pos)[0], pos + 8
+        if tag == 0xCB:
+            return struct.unpack_from(">d", data, pos)[0], pos + 8
+
+        if 0xA0 <= tag < 0xC0:  # fixstr
+            length = tag & 0x1F
+        elif tag == 0xDB:
+            length = struct.unpack_from(">I", data, pos)[0]
+            pos += 4
+        else:
+            length = None
+        if length is not None:
+            if pos + length > len(data):
+                raise ValueError("string past the end of the record")
+            return data[pos : pos + length].decode(), pos + length
+
+        if 0x90 <= tag < 0xA0:  # fixarray
+            count = tag & 0x0F
+        elif tag == 0xDD:
+            count = struct.unpack_from(">I", data, pos)[0]
+            pos += 4
+        else:
+            count = None
+        if count is not None:
+            items = []
+            for _ in range(count):
+                item, pos = cls.unpack(data, pos)
+                items.append(item)
+            return items, pos
+
+        if 0x80 <= tag < 0x90:  # fixmap
+            count = tag & 0x0F
+        elif tag == 0xDF:
+            count = struct.unpack_from(">I", data, pos)[0]
+            pos += 4
+        else:
+            raise ValueError(f"unknown type {tag}")
+        items = {}
+        for _ in range(count):
+            key, pos = cls.unpack(data, pos)
+            items[key], pos = cls.unpack(data, pos)
+        return items, pos
+
+
+class LegacyCodec:
+    """
+    Reads files written by older versions, where each line is the repr of a dict
+
+    The lines are read as Python literals, so nothing in the file is run. This format
+    is only read, files are saved in another format.
+    """
+
+    name = "legacy"
+
+    @staticmethod
+    def matches(start):
+        """
+        :param start: the first bytes of a file that isn't empty
+        :type start: bytes
+        :return: whether the file may be in this format
+        :rtype: bool
+        """
+        return start.lstrip().startswith(b"{")
+
+    @staticmethod
+    def encode(records):
+        raise TypeError("Legacy files can only be read")
+
+    @staticmethod
+    def decode(f, name):
+        """
+        Reads the records one at a time
+
+        :param f: the file, opened in binary mode
+        :type f: io.BufferedReader
+        :param name: the name of the file, for errors
+        :type name: str
+        :return: each record
+        :rtype: iterator[dict]
+        """
+        for line in f:
+            if line.strip() == b"":
+                continue
+            try:
+                yield ast.literal_eval(line.decode())
+            except (SyntaxError, ValueError) as error:
+                raise InvalidRecord(name, str(error))
+
+
+CODECS = {codec.name: codec for codec in (JsonLinesCodec, BinaryCodec)}
+"""The formats files can be saved in, by name
+:type: dict[str, class]"""
+
+BUFFER_SIZE = 1 << 16
+"""The number of bytes read or written at once
+:type: int"""
+
+
+class Storage:
+    """
+    Writes files so a crash never leaves one half written, committing them in groups
+
+    A file is replaced by writing a temporary file, which is renamed over the old one
+    once its contents are on the disk, so the file is either the old version or the
+    new one. Forcing data onto the disk with fsync is slow, so instead of doing it
+    for every write, the files written in the last sync_interval seconds are synced
+    together: each temporary file is synced and renamed, then each changed directory
+    is synced so the renames are on the disk too. Appends are written straight away
+    and synced in the same group.
+
+    Until a file is committed its name still gives the old version, so flush must be
+    called before reading a file that may have been written. If the power is cut,
+    up to sync_interval seconds of writes may be lost, but no file is ever broken.
+    """
+
+    def __init__(self, sync_interval=1.0, history=100):
+        """
+        :param sync_interval: the most seconds a write waits to be synced
+        :type sync_interval: float
+        :param history: the number of write and sync times kept for get_stats
+        :type history: int
+        """
+        self.sync_interval = sync_interval
+
+        self.uncommitted = set()
+        """The files with a temporary file waiting to be renamed over them
+        :type: set[str]"""
+        self.appended = set()
+        """The files appended to since the last sync
+        :type: set[str]"""
+        self.unsynced = set()
+        """The directories changed since the last sync
+        :type: set[str]"""
+        self.timer = None
+        """The timer that will sync every change, None if there are none
+        :type: threading.Timer or None"""
+        # held while a file is written or committed, so a temporary file is never
+        # renamed while it is being written
+        self.lock = threading.Lock()
+
+        self.write_count = 0
+        self.commit_count = 0
+        self.sync_count = 0
+        self.write_times = deque(maxlen=history)
+        """The seconds taken by the latest writes
+        :type: deque[float]"""
+        self.sync_times = deque(maxlen=history)
+        """The seconds taken by the latest syncs
+        :type: deque[float]"""
+
+    def write(self, name, chunks):
+        """
+        Replaces a file, it is committed with the next sync or flush
+
+        Writing the same file again before then replaces the uncommitted version,
+        so only the latest one is synced.
+
+        :param name: the name of the file
+        :type name: str
+        :param chunks: the contents of the file
+        :type chunks: iterable[bytes]
+        :rtype: None
+        """
+        name = os.path.abspath(name)
+        # written beside the temporary file, so if writing fails the version
+        # waiting to be committed is kept
+        part_name = name + ".tmp.part"
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                with open(part_name, "wb", buffering=BUFFER_SIZE) as f:
+                    f.writelines(chunks)
+            except BaseException:
+                if isfile(part_name):
+                    os.remove(part_name)
+                raise
+            os.replace(part_name, name + ".tmp")
+            self.uncommitted.add(name)
+            self.appended.discard(name)
+            self.write_count += 1
+            self.write_times.append(time.perf_counter() - start)
+            self._start_timer()
+
+    def append(self, name, data):
+        """
+        Adds to the end of a file, it is synced with the next sync
+
+        :param name: the name of the file
+        :type name: str
+        :param data: the bytes to add
+        :type data: bytes
+        :return: the size of the file afterwards
+        :rtype: int
+        """
+        name = os.path.abspath(name)
+        with self.lock:
+            start = time.perf_counter()
+            self._commit(name)
+            created = not isfile(name)
+            with open(name, "ab") as f:
+                f.write(data)
+                size = f.tell()
+            self.appended.add(name)
+            if created:
+                self.unsynced.add(os.path.dirname(name))
+            self.write_count += 1
+            self.write_times.append(time.perf_counter() - start)
+            self._start_timer()
+        return size
+
+    def replace(self, source, destination):
+        """
+        Renames a file, replacing the destination
+
+        :param source: the name of the file to rename
+        :type source: str
+        :param destination: the new name
+        :type destination: str
+        :rtype: None
+        """
+        source = os.path.abspath(source)
+        destination = os.path.abspath(destination)
+        with self.lock:
+            self._commit(source)
+            # an uncommitted version of the destination would replace the source
+            if destination in self.uncommitted:
+                self.uncommitted.discard(destination)
+                os.remove(destination + ".tmp")
+            os.replace(source, destination)
+            self.appended.discard(destination)
+            if source in self.appended:
+                self.appended.discard(source)
+                self.appended.add(destination)
+            self.unsynced.add(os.path.dirname(destination))
+            self._start_timer()
+
+    def flush(self, name):
+        """
+        Commits a file if it has been written, so reading it gives the latest version
+
+        The rename isn't synced until the next sync.
+
+        :param name: the name of the file
+        :type name: str
+        :rtype: None
+        """
+        with self.lock:
+            self._commit(os.path.abspath(name))
+
+    def _commit(self, name):
+        """
+        Syncs the temporary file of a file and renames it over the file,
+        the lock must be held
+
+        :param name: the absolute name of the file
+        :type name: str
+        :rtype: None
+        """
+        if name not in self.uncommitted:
+            return
+        self.uncommitted.discard(name)
+        temp_name = name + ".tmp"
+        fd = os.open(temp_name, os.O_RDONLY)
+        try:
+            # the contents must be on the disk before the rename can be
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp_name, name)
+        self.unsynced.add(os.path.dirname(name))
+        self.commit_count += 1
+
+    def _start_timer(self):
+        """Makes sure the changes will be synced, the lock must be held"""
+        if self.timer is None:
+            self.timer = threading.Timer(self.sync_interval, self.sync)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def sync(self):
+        """
+        Commits every written file and forces every change onto the disk
+
+        :rtype: None
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not (self.uncommitted or self.appended or self.unsynced):
+                return
+            start = time.perf_counter()
+            for name in list(self.uncommitted):
+                self._commit(name)
+            appended = self.appended
+            directories = self.unsynced
+            self.appended = set()
+            self.unsynced = set()
+
+        # synced without the lock so writes don't wait for the disk
+        for name in appended:
+            try:
+                fd = os.open(name, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # it has been removed since
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        # directories can only be opened and synced on posix, elsewhere renames are
+        # written to the disk by the file system itself
+        if os.name == "posix":
+            for directory in directories:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        with self.lock:
+            self.sync_count += 1
+            self.sync_times.append(time.perf_counter() - start)
+
+    def get_stats(self):
+        """
+        :return: the number of writes, commits and syncs, and the mean and longest
+            times of the latest writes and syncs in milliseconds
+        :rtype: dict[str, float]
+        """
+        with self.lock:
+            stats = {
+                "writes": self.write_count,
+                "commits": self.commit_count,
+                "syncs": self.sync_count,
+            }
+            for kind, times in (("write", self.write_times), ("sync", self.sync_times)):
+                if len(times) > 0:
+                    stats[f"mean_{kind}_ms"] = sum(times) / len(times) * 1000
+                    stats[f"max_{kind}_ms"] = max(times) * 1000
+                else:
+                    stats[f"mean_{kind}_ms"] = stats[f"max_{kind}_ms"] = 0.0
+        return stats
+
+
+storage = Storage()
+"""The storage every file is written through
+:type: Storage"""
+# anything written in the last interval is committed when the program closes
+atexit.register(storage.sync)
+
+
+def detect_codec(name):
+    """
+    Works out the format of a file from its first bytes
+
+    :param name: the name of the file
+    :type name: str
+    :return: the codec of the file, None if it is empty
+    :rtype: class or None
+    """
+    # the latest version may not have been committed yet
+    storage.flush(name)
+    with open(name, "rb") as f:
+        start = f.read(256)
+    if start.strip() == b"":
+        return None
+    # binary first, a JSON line can't start with its magic bytes
+    for codec in (BinaryCodec, JsonLinesCodec, LegacyCodec):
+        if codec.matches(start):
+            return codec
+    raise InvalidRecord(name, "unknown format")
+
+
+def read_records(name):
+    """
+    Reads the records of a file one at a time, whatever format it is in
+
+    :param name: the name of the file
+    :type name: str
+    :return: each record
+    :rtype: iterator[dict]
+    """
+    codec = detect_codec(name)
+    if codec is None:
+        return
+    with open(name, "rb", buffering=BUFFER_SIZE) as f:
+        yield from codec.decode(f, name)
+
+
+def write_records(name, records, codec=JsonLinesCodec):
+    """
+    Replaces a file with the records
+
+    :param name: the name of the file
+    :type name: str
+    :param records: the records to write
+    :type records: iterable[dict]
+    :param codec: the format to write in
+    :type codec: class
+    :rtype: None
+    """
+    storage.write(name, codec.encode(records))
+
+
+def get_record_identifier(record):
+    """
+    :param record: a record read from a file
+    :type record: dict
+    :return: the first value of the record as a string, as File.get_identifier does
+    :rtype: str
+    """
+    return str(next(iter(record.values())))
+
+
+def replay_journal(name, records):
+    """
+    Applies the changes in a journal written by File to the records
+
+    Each line is a JSON object with the identifier of a record and either "delete",
+    or the values to "set" and the lists to "extend" from a given position.
+    Replaying the same changes again gives the same records. A partly written
+    last line, left if the program stopped while saving, is ignored.
+
+    :param name: the name of the journal file
+    :type name: str
+    :param records: the records by identifier, changed in place
+    :type records: dict[str, dict]
+    :return: the number of bytes of complete lines in the journal
+    :rtype: int
+    """
+    with open(name, "rb", buffering=BUFFER_SIZE) as f:
+        data = f.read()
+    lines = data.split(b"\n")
+    # every entry ends with a new line, anything after the last one is unfinished
+    unfinished = lines.pop()
+    for line in lines:
+        if line.strip() == b"":
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as error:
+            raise InvalidRecord(name, str(error))
+
+        identifier = entry["id"]
+        if entry.get("delete"):
+            records.pop(identifier, None)
+            continue
+        record = dict(records.get(identifier, {}))
+        record.update(entry.get("set", {}))
+        for key, (start, items) in entry.get("extend", {}).items():
+            record[key] = record[key][:start] + items
+        records[identifier] = record
+    return len(data) - len(unfinished)
+
+
+def migrate(name, codec=JsonLinesCodec):
+    """
+    Rewrites a file in another format, such as files saved by older versions
+
+    :param name: the name of the file
+    :type name: str
+    :param codec: the format to write in
+    :type codec: class
+    :return: the number of records
+    :rtype: int
+    """
+    records = list(read_records(name))
+    write_records(name, records, codec)
+    return len(records)
+
+
 class File:
     """
     This class manages a list of objects in a file
@@ -36,9 +725,13 @@ class File:
 
     Either the entire list should be modified or only single objects should be modified.
     These should not be sued together.
+
+    In journaled mode save only appends the changes since the last save to a journal
+    file next to the main file. Once the journal is large enough the main file is
+    rewritten with all the changes in a background thread, and the journal is cleared.
     """
 
-    def __init__(self, file, cls):
+    def __init__(self, file, cls, codec="jsonl", journal=False, compact_size=1 << 20):
         """
         :param file: the name of the file to store the data in, must be .txt
         :type file: str
@@ -47,15 +740,47 @@ class File:
             arg0 must be a unique identifier.
             the attributes self.'s must be the exact same as the parameters
         :type cls: class
+        :param codec: the format to save in, a key of CODECS. Files in any format
+            are read, and are saved in this format
+        :type codec: str
+        :param journal: whether to save changes to a journal instead of rewriting
+            the file each time
+        :type journal: bool
+        :param compact_size: the size in bytes the journal can grow to before the
+            file is rewritten
+        :type compact_size: int
         """
         self.name = file
         self.cls = cls
+        self.codec = CODECS[codec]
+        self.journal = journal
+        self.compact_size = compact_size
+        self.journal_name = file + ".journal"
+        self.old_journal_name = file + ".journal.old"
 
         self.list = []
-        """The list of all data in the file
+        """The list of all data in the file, in no particular order
         :type list: list[object]"""
+        self.index = None
+        """The position in self.list of each identifier,
+        None if the list may have changed since it was built
+        :type: dict[str, int] or None"""
+
+        self.saved = {}
+        """A copy of each record as it is in the file and journal, by identifier,
+        only used in journaled mode. The records are replaced, never changed,
+        so the compactor can write them while the game carries on
+        :type: dict[str, dict]"""
+        self.changed = set()
+        """The identifiers that may have changed since the last save,
+        None if any of them may have
+        :type: set[str] or None"""
+        self.compactor = None
+        """The thread rewriting the file, None if it isn't running
+        :type: threading.Thread or None"""
 
         # check file exists, create if it doesn't
+        storage.flush(self.name)
         if not isfile(self.name):
             f = open(self.name, "w")
             f.close()
@@ -75,9 +800,7 @@ class File:
         :return: the identifier of the object
         :rtype: str
         """
-        keys = list(obj.__dict__.keys())
-        identifier = obj.__dict__[keys[0]]
-        return str(identifier)
+        return str(next(iter(obj.__dict__.values())))
 
     def read(self):
         """
@@ -85,20 +808,52 @@ class File:
 
         :rtype: None
         """
-        f = open(self.name, "r")
-        file_str = f.read()
-        f.close()
-
-        # check file isn't empty
-        if file_str == "":
+        if not self.journal:
+            self.list.extend(self.iter_objects())
+            self.index = None
             return
 
-        objects = file_str.split("\n")
-        objects.pop()  # get rid of newline at end of file
-        for obj in objects:
-            self.list.append(
-                self.cls(**eval(obj))  # convert string to dict and pass as kwargs
-            )
+        records = {}
+        for record in read_records(self.name):
+            records[get_record_identifier(record)] = record
+        # a journal left by a compaction that didn't finish comes first
+        unfinished = isfile(self.old_journal_name)
+        for name in (self.old_journal_name, self.journal_name):
+            if isfile(name):
+                size = replay_journal(name, records)
+                # remove a partly written line so new changes start on a new line
+                if size < os.path.getsize(name):
+                    os.truncate(name, size)
+
+        self.list.extend(self.cls(**record) for record in records.values())
+        self.index = None
+        # the objects may change their values in place, so keep separate copies
+        self.saved = copy.deepcopy(records)
+        if unfinished:
+            self.compact()
+
+    def iter_objects(self):
+        """
+        Reads the objects in the file one at a time, without changing self.list
+
+        :return: each object
+        :rtype: iterator[object]
+        """
+        for record in read_records(self.name):
+            yield self.cls(**record)  # pass the dict as kwargs
+
+    def get_index(self):
+        """
+        Gets the position of each identifier, building it if the list has changed
+
+        :return: the position in self.list of each identifier
+        :rtype: dict[str, int]
+        """
+        if self.index is None:
+            self.index = {
+                self.get_identifier(obj): pos for pos, obj in enumerate(self.list)
+            }
+        return self.index
 
     def sort(self):
         """
@@ -106,49 +861,25 @@ class File:
 
         :rtype: None
         """
-        self.list.sort(key=lambda obj: self.get_identifier(obj))
+        self.list.sort(key=self.get_identifier)
+        self.index = None
 
     def search(self, target):
         """
-        Finds the position of the target in the list, automatically orders the list
+        Finds the position of the target in the list
 
         :param target: the target to search for
         :type target: object
         :return: the position of the target, -1 if not found
         :rtype: int
         """
-
-        def binary_search(lst, start_pos=0):
-            """
-            Recursive binary search using the identifier
-
-            :param lst: the list section to search
-            :type lst: list
-            :param start_pos: the start position of the list section
-            :type start_pos: int
-            :return: the position of the target, -1 if not found
-            :rtype: int
-            """
-            # empty list
-            if len(lst) == 0:
-                return -1
-
-            mid = len(lst) // 2
-            identifier = self.get_identifier(lst[mid])
-
-            if identifier == target:
-                return mid + start_pos
-            elif identifier > target:
-                return binary_search(lst[:mid], start_pos)
-            else:
-                return binary_search(lst[mid + 1 :], start_pos + mid + 1)
-
-        self.sort()  # order the list
-        target = str(target)  # for comparison to prevent errors
-        return binary_search(self.list)
+        return self.get_index().get(str(target), -1)
 
     def get_list(self):
         """Returns the list of objects"""
+        # the caller may change the list, so the index is rebuilt when next needed
+        self.index = None
+        self.changed = None
         return self.list
 
     def replace_list(self, lst):
@@ -160,14 +891,144 @@ class File:
         :rtype: None
         """
         self.list = lst
+        self.index = None
+        self.changed = None
 
     def save(self):
-        """Sorts self.list then replaces the file with it."""
-        self.sort()
-        f = open(self.name, "w")
-        for obj in self.list:
-            f.write(str(obj.__dict__) + "\n")
-        f.close()
+        """
+        Replaces the file with self.list, ordered by identifier.
+        In journaled mode only the changes are saved
+
+        :rtype: None
+        """
+        if self.journal:
+            self.save_changes()
+            return
+        ordered = sorted(self.list, key=self.get_identifier)
+        write_records(self.name, (obj.__dict__ for obj in ordered), self.codec)
+
+    def save_changes(self):
+        """
+        Appends the changes since the last save to the journal,
+        then compacts the file in the background if the journal is too large
+
+        :rtype: None
+        """
+        index = self.get_index()
+        changed = self.changed
+        if changed is None:
+            changed = set(index) | set(self.saved)
+        self.changed = set()
+
+        entries = []
+        for identifier in sorted(changed):
+            if identifier in index:
+                entry = self.get_changes(identifier, self.list[index[identifier]])
+            elif identifier in self.saved:
+                entry = {"id": identifier, "delete": True}
+                del self.saved[identifier]
+            else:
+                entry = None
+            if entry is not None:
+                entries.append(json.dumps(entry, separators=(",", ":")).encode())
+        if len(entries) == 0:
+            return
+
+        size = storage.append(self.journal_name, b"\n".join(entries) + b"\n")
+        if size > self.compact_size:
+            self.compact(background=True)
+
+    def get_changes(self, identifier, obj):
+        """
+        Works out the journal entry for an object and updates self.saved to match
+
+        Lists that have only had items added to the end are saved as the new items
+
+        :param identifier: the identifier of the object
+        :type identifier: str
+        :param obj: the object
+        :type obj: object
+        :return: the journal entry, None if nothing has changed
+        :rtype: dict or None
+        """
+        old = self.saved.get(identifier)
+        if old is None:
+            self.saved[identifier] = copy.deepcopy(obj.__dict__)
+            return {"id": identifier, "set": obj.__dict__}
+
+        new = dict(old)
+        changes = {}
+        extensions = {}
+        for key, value in obj.__dict__.items():
+            old_value = old.get(key)
+            if value == old_value:
+                continue
+            if (
+                isinstance(value, list)
+                and isinstance(old_value, list)
+                and len(value) > len(old_value)
+                and value[: len(old_value)] == old_value
+            ):
+                # the start is saved with the items so the entry can be replayed twice
+                tail = copy.deepcopy(value[len(old_value) :])
+                extensions[key] = [len(old_value), tail]
+                new[key] = old_value + tail
+            else:
+                changes[key] = value
+                new[key] = copy.deepcopy(value)
+        if len(changes) == 0 and len(extensions) == 0:
+            return None
+
+        self.saved[identifier] = new
+        entry = {"id": identifier}
+        if len(changes) > 0:
+            entry["set"] = changes
+        if len(extensions) > 0:
+            entry["extend"] = extensions
+        return entry
+
+    def compact(self, background=False):
+        """
+        Rewrites the file with every saved change and clears the journal
+
+        :param background: whether to rewrite the file in a separate thread
+        :type background: bool
+        :rtype: None
+        """
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        records = [self.saved[key] for key in sorted(self.saved)]
+        # changes saved from now on go in a new journal
+        if isfile(self.journal_name):
+            if isfile(self.old_journal_name):
+                with open(self.journal_name, "rb") as f:
+                    data = f.read()
+                storage.append(self.old_journal_name, data)
+                os.remove(self.journal_name)
+            else:
+                storage.replace(self.journal_name, self.old_journal_name)
+
+        if background:
+            self.compactor = threading.Thread(
+                target=self._write_compacted, args=(records,), daemon=True
+            )
+            self.compactor.start()
+        else:
+            self._write_compacted(records)
+
+    def _write_compacted(self, records):
+        """
+        Replaces the file with the records then removes the old journal
+
+        :param records: every record in the file
+        :type records: list[dict]
+        :rtype: None
+        """
+        write_records(self.name, records, self.codec)
+        # the old journal is only needed until the rename is on the disk
+        storage.sync()
+        if isfile(self.old_journal_name):
+            os.remove(self.old_journal_name)
 
     def get_object(self, identifier):
         """
@@ -191,8 +1052,10 @@ class File:
         :type obj: object
         :rtype: None
         """
+        identifier = self.get_identifier(obj)
+        self.get_index()[identifier] = len(self.list)
         self.list.append(obj)
-        self.sort()
+        self.mark_changed(identifier)
 
     def update_object(self, identifier, obj):
         """
@@ -205,10 +1068,16 @@ class File:
         :return: None or raises exception ObjectNotFound if the object is not found
         :rtype: None
         """
-        pos = self.search(identifier)
+        index = self.get_index()
+        pos = index.pop(str(identifier), -1)
         if pos == -1:
             raise ObjectNotFound(identifier, self.name)
         self.list[pos] = obj
+        # the new object may have a different identifier
+        new_identifier = self.get_identifier(obj)
+        index[new_identifier] = pos
+        self.mark_changed(str(identifier))
+        self.mark_changed(new_identifier)
 
     def remove_object(self, identifier):
         """
@@ -219,10 +1088,27 @@ class File:
         :return: None or raises exception ObjectNotFound if the object is not found
         :rtype: None
         """
-        pos = self.search(identifier)
+        index = self.get_index()
+        pos = index.pop(str(identifier), -1)
         if pos == -1:
             raise ObjectNotFound(identifier, self.name)
-        self.list.pop(pos)
+        # move the last object into the gap so no other positions change
+        last = self.list.pop()
+        if pos < len(self.list):
+            self.list[pos] = last
+            index[self.get_identifier(last)] = pos
+        self.mark_changed(str(identifier))
+
+    def mark_changed(self, identifier):
+        """
+        Records that an object needs to be checked the next time changes are saved
+
+        :param identifier: the identifier of the object
+        :type identifier: str
+        :rtype: None
+        """
+        if self.changed is not None:
+            self.changed.add(identifier)
 
 
 # testing
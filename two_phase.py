@@ -0,0 +1,823 @@
+"""
+This file contains a two-phase solver that solves the cube from its state alone
+
+The solver follows Kociemba's two-phase algorithm. The cube is described by
+coordinates, numbers that each capture one part of the state, such as the orientation
+of the corners. Phase 1 moves the cube into the group where every piece is
+oriented and the middle layer edges are in the middle layer. Phase 2 then solves it
+using only the moves that keep it in that group. Move tables give the new coordinate
+after each move and pruning tables give a lower bound on the moves left, so an
+iterative deepening search can skip most of the moves it would otherwise try.
+
+Faces are named U, R, F, D, L, B as seen from the front of the cube. The tables are
+built the first time they are needed, which takes a few seconds, and saved to
+TABLE_FILE so later starts can memory-map them instead. Run this file to build them
+ahead of time using every CPU.
+
+black, isort and flake8 used for formatting
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from math import factorial
+
+import numpy
+from table_store import TableStore
+
+
+class InvalidCube(Exception):
+    """This exception is raised when a cube state can't be reached by turning a cube"""
+
+    def __init__(self, reason):
+        """
+        :param reason: why the state is invalid
+        :type reason: str
+        """
+        super().__init__(f"Invalid cube: {reason}")
+
+
+# faces in the order used by the solver, and the face number used by game_data
+FACES = "URFDLB"
+"""The names of the faces, a face's index in this string is its face number
+:type: str"""
+FACE_POSITIONS = {"U": 4, "R": 2, "F": 1, "D": 5, "L": 0, "B": 3}
+"""The position of each face in game_data.default_cube
+:type: dict[str, int]"""
+
+
+def _facelets(names):
+    """
+    Converts facelet names into sticker indices
+
+    Facelets are numbered 1 to 9 along the rows of each face,
+    matching the rows and columns of game_data.default_cube
+
+    :param names: space separated facelet names, e.g. "U9 R1 F3"
+    :type names: str
+    :return: the index of each facelet in the flat sticker array
+    :rtype: list[int]
+    """
+    return [FACE_POSITIONS[name[0]] * 9 + int(name[1]) - 1 for name in names.split()]
+
+
+# pieces are numbered in the order of these lists
+# corners: URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB
+# edges: UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR
+# the first facelet of a corner is on U or D, the others follow clockwise
+CORNER_FACELETS = [
+    _facelets(names)
+    for names in (
+        "U9 R1 F3",
+        "U7 F1 L3",
+        "U1 L1 B3",
+        "U3 B1 R3",
+        "D3 F9 R7",
+        "D1 L9 F7",
+        "D7 B9 L7",
+        "D9 R9 B7",
+    )
+]
+EDGE_FACELETS = [
+    _facelets(names)
+    for names in (
+        "U6 R2",
+        "U8 F2",
+        "U4 L2",
+        "U2 B2",
+        "D6 R8",
+        "D2 F8",
+        "D4 L8",
+        "D8 B8",
+        "F6 R4",
+        "F4 L6",
+        "B6 L4",
+        "B4 R6",
+    )
+]
+CORNER_FACES = ["URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB"]
+EDGE_FACES = ["UR", "UF", "UL", "UB", "DR", "DF", "DL", "DB", "FR", "FL", "BL", "BR"]
+
+# each basic move as (corner permutation, corner orientation,
+# edge permutation, edge orientation), the piece that moves into each position
+_BASIC_MOVES = {
+    "U": (
+        [3, 0, 1, 2, 4, 5, 6, 7],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [3, 0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11],
+        [0] * 12,
+    ),
+    "R": (
+        [4, 1, 2, 0, 7, 5, 6, 3],
+        [2, 0, 0, 1, 1, 0, 0, 2],
+        [8, 1, 2, 3, 11, 5, 6, 7, 4, 9, 10, 0],
+        [0] * 12,
+    ),
+    "F": (
+        [1, 5, 2, 3, 0, 4, 6, 7],
+        [1, 2, 0, 0, 2, 1, 0, 0],
+        [0, 9, 2, 3, 4, 8, 6, 7, 1, 5, 10, 11],
+        [0, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0],
+    ),
+    "D": (
+        [0, 1, 2, 3, 5, 6, 7, 4],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 2, 3, 5, 6, 7, 4, 8, 9, 10, 11],
+        [0] * 12,
+    ),
+    "L": (
+        [0, 2, 6, 3, 4, 1, 5, 7],
+        [0, 1, 2, 0, 0, 2, 1, 0],
+        [0, 1, 10, 3, 4, 5, 9, 7, 8, 2, 6, 11],
+        [0] * 12,
+    ),
+    "B": (
+        [0, 1, 3, 7, 4, 5, 2, 6],
+        [0, 0, 1, 2, 0, 0, 2, 1],
+        [0, 1, 2, 11, 4, 5, 6, 10, 8, 9, 3, 7],
+        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 1],
+    ),
+}
+
+
+def _multiply(a, b):
+    """
+    Does the cubie cube b after the cubie cube a
+
+    :param a: the first cube as (cp, co, ep, eo)
+    :type a: tuple[list[int], list[int], list[int], list[int]]
+    :param b: the second cube as (cp, co, ep, eo)
+    :type b: tuple[list[int], list[int], list[int], list[int]]
+    :return: the combined cube as (cp, co, ep, eo)
+    :rtype: tuple[list[int], list[int], list[int], list[int]]
+    """
+    a_cp, a_co, a_ep, a_eo = a
+    b_cp, b_co, b_ep, b_eo = b
+    return (
+        [a_cp[i] for i in b_cp],
+        [(a_co[b_cp[i]] + b_co[i]) % 3 for i in range(8)],
+        [a_ep[i] for i in b_ep],
+        [(a_eo[b_ep[i]] + b_eo[i]) % 2 for i in range(12)],
+    )
+
+
+_SOLVED = (list(range(8)), [0] * 8, list(range(12)), [0] * 12)
+
+# moves are numbered face * 3 + (quarter turns - 1), so U, U2, U', R, R2, ...
+MOVE_CUBES = []
+"""The cubie cube of each of the 18 face moves
+:type: list[tuple[list[int], list[int], list[int], list[int]]]"""
+for _face in FACES:
+    _cube = _SOLVED
+    for _ in range(3):
+        _cube = _multiply(_cube, _BASIC_MOVES[_face])
+        MOVE_CUBES.append(_cube)
+MOVE_NAMES = [face + power for face in FACES for power in ("", "2", "'")]
+"""The name of each of the 18 face moves in standard notation
+:type: list[str]"""
+
+PHASE2_MOVES = [0, 1, 2, 4, 7, 9, 10, 11, 13, 16]
+"""The moves that keep the cube in the phase 2 group: U, U2, U', R2, F2, D, D2, D',
+L2, B2
+:type: list[int]"""
+
+TWIST_COUNT = 3**7
+FLIP_COUNT = 2**11
+SLICE_COUNT = 495  # ways to place 4 middle layer edges in 12 positions
+SLICE_SORTED_COUNT = SLICE_COUNT * 24
+
+
+def _rank(perms):
+    """
+    Numbers permutations by their lexicographic order
+
+    :param perms: one permutation of 0 to n-1 per row
+    :type perms: numpy.ndarray
+    :return: the rank of each permutation
+    :rtype: numpy.ndarray
+    """
+    n = perms.shape[1]
+    rank = numpy.zeros(len(perms), dtype=numpy.int64)
+    for i in range(n - 1):
+        # count the smaller values after position i
+        smaller = (perms[:, i + 1 :] < perms[:, i : i + 1]).sum(axis=1)
+        rank += smaller * factorial(n - 1 - i)
+    return rank
+
+
+def _digits(values, base, count):
+    """
+    :param values: numbers to split into digits
+    :type values: numpy.ndarray
+    :param base: the base of the digits
+    :type base: int
+    :param count: the number of digits
+    :type count: int
+    :return: the digits of each number, most significant first
+    :rtype: numpy.ndarray
+    """
+    powers = base ** numpy.arange(count - 1, -1, -1)
+    return (values[:, None] // powers) % base
+
+
+def _orientations(coordinates, base, count):
+    """
+    Decodes twist or flip coordinates into orientations of every piece
+
+    :param coordinates: the coordinates to decode
+    :type coordinates: numpy.ndarray
+    :param base: 3 for corners, 2 for edges
+    :type base: int
+    :param count: the number of pieces
+    :type count: int
+    :return: the orientation of each piece for each coordinate
+    :rtype: numpy.ndarray
+    """
+    orientations = _digits(coordinates, base, count - 1)
+    # the orientation of the last piece is fixed by the others
+    last = (-orientations.sum(axis=1)) % base
+    return numpy.concatenate([orientations, last[:, None]], axis=1)
+
+
+def _orientation_coordinate(orientations, base):
+    """
+    :param orientations: the orientation of each piece, one cube per row
+    :type orientations: numpy.ndarray
+    :param base: 3 for corners, 2 for edges
+    :type base: int
+    :return: the twist or flip coordinate of each row
+    :rtype: numpy.ndarray
+    """
+    count = orientations.shape[1] - 1
+    powers = base ** numpy.arange(count - 1, -1, -1)
+    return orientations[:, :count] @ powers
+
+
+# the slice coordinate numbers where the 4 middle layer edges are
+# the set of positions comes first, then their order
+# the solved positions 8 to 11 are the first set so they are coordinates 0 to 23
+_SLICE_SETS = list(combinations(range(11, -1, -1), 4))
+SLICE_POSITIONS = numpy.zeros((SLICE_SORTED_COUNT, 4), dtype=numpy.intp)
+"""The positions of the FR, FL, BL and BR edges for each slice coordinate
+:type: numpy.ndarray"""
+for _set_index, _positions in enumerate(_SLICE_SETS):
+    _ordered = sorted(_positions)
+    for _order_index, _order in enumerate(permutations(range(4))):
+        # _order gives which middle layer edge is at each sorted position
+        for _position, _edge in zip(_ordered, _order):
+            SLICE_POSITIONS[_set_index * 24 + _order_index, _edge] = _position
+
+# reads 4 positions as a base 12 number to look up their coordinate
+_SLICE_WEIGHTS = numpy.array([12**3, 12**2, 12, 1])
+_SLICE_LOOKUP = numpy.zeros(12**4, dtype=numpy.int64)
+_SLICE_LOOKUP[SLICE_POSITIONS @ _SLICE_WEIGHTS] = numpy.arange(SLICE_SORTED_COUNT)
+
+
+def _slice_coordinate(positions):
+    """
+    :param positions: the positions of the FR, FL, BL and BR edges, one cube per row
+    :type positions: numpy.ndarray
+    :return: the slice coordinate of each row
+    :rtype: numpy.ndarray
+    """
+    return _SLICE_LOOKUP[positions @ _SLICE_WEIGHTS]
+
+
+def _move_arrays():
+    """
+    :return: the cp, co, ep and eo of the 18 face moves, one move per row
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    return tuple(numpy.array([cube[i] for cube in MOVE_CUBES]) for i in range(4))
+
+
+def _build_move_table(name):
+    """
+    Builds one move table, the new coordinate after each move from each coordinate
+
+    :param name: the name of the table, one of MOVE_TABLES
+    :type name: str
+    :return: the move table
+    :rtype: numpy.ndarray
+    """
+    move_cp, move_co, move_ep, move_eo = _move_arrays()
+
+    # orientation coordinates, the piece moving into position i brings its orientation
+    if name == "twist_move":
+        co = _orientations(numpy.arange(TWIST_COUNT), 3, 8)
+        columns = [
+            _orientation_coordinate((co[:, move_cp[m]] + move_co[m]) % 3, 3)
+            for m in range(18)
+        ]
+        return numpy.stack(columns, axis=1).astype(numpy.int16)
+    if name == "flip_move":
+        eo = _orientations(numpy.arange(FLIP_COUNT), 2, 12)
+        columns = [
+            _orientation_coordinate((eo[:, move_ep[m]] + move_eo[m]) % 2, 2)
+            for m in range(18)
+        ]
+        return numpy.stack(columns, axis=1).astype(numpy.int16)
+
+    if name == "slice_move":
+        # the edge at position p moves to the position i where move_ep[i] is p
+        new_position = numpy.argsort(move_ep, axis=1)
+        columns = [
+            _slice_coordinate(new_position[m][SLICE_POSITIONS]) for m in range(18)
+        ]
+        return numpy.stack(columns, axis=1).astype(numpy.int16)
+
+    # permutation coordinates, row r of all_perms has rank r
+    all_perms = numpy.array(list(permutations(range(8))), dtype=numpy.int8)
+    if name == "corners_move":
+        columns = [_rank(all_perms[:, move_cp[m]]) for m in range(18)]
+    else:
+        # phase 2 moves keep the up and down layer edges in positions 0 to 7
+        columns = [_rank(all_perms[:, move_ep[m][:8]]) for m in PHASE2_MOVES]
+    return numpy.stack(columns, axis=1).astype(numpy.uint16)
+
+
+MOVE_TABLES = ["twist_move", "flip_move", "slice_move", "corners_move", "edges_move"]
+"""The names of the move tables
+:type: list[str]"""
+
+
+def _build_prune_table(args):
+    """
+    Builds one pruning table
+
+    :param args: the move tables of its two coordinates and the moves to search with
+    :type args: tuple[numpy.ndarray, numpy.ndarray, range]
+    :return: the pruning table
+    :rtype: numpy.ndarray
+    """
+    return _prune(*args)
+
+
+def build_tables(processes=1):
+    """
+    Builds the move and pruning tables used by the solver
+
+    :param processes: the number of processes to build the tables with,
+        None uses one per CPU
+    :type processes: int or None
+    :return: the tables by name
+    :rtype: dict[str, numpy.ndarray]
+    """
+    if processes == 1:
+        return _build_tables(map)
+    with ProcessPoolExecutor(processes) as executor:
+        return _build_tables(executor.map)
+
+
+def _build_tables(map_function):
+    """
+    :param map_function: map, or the map method of an executor
+    :type map_function: function
+    :return: the tables by name
+    :rtype: dict[str, numpy.ndarray]
+    """
+    tables = dict(zip(MOVE_TABLES, map_function(_build_move_table, MOVE_TABLES)))
+
+    # phase 1 only needs the set of middle layer positions, not their order
+    slice_set_move = tables["slice_move"][::24] // 24
+    # in phase 2 the slice coordinate is the order of the middle layer edges
+    slice_order_move = tables["slice_move"][:24, PHASE2_MOVES]
+    phase2 = range(len(PHASE2_MOVES))
+    prune_tables = {
+        "twist_prune": (tables["twist_move"], slice_set_move, range(18)),
+        "flip_prune": (tables["flip_move"], slice_set_move, range(18)),
+        "corners_prune": (
+            tables["corners_move"][:, PHASE2_MOVES],
+            slice_order_move,
+            phase2,
+        ),
+        "edges_prune": (tables["edges_move"], slice_order_move, phase2),
+    }
+    tables.update(
+        zip(prune_tables, map_function(_build_prune_table, prune_tables.values()))
+    )
+    return tables
+
+
+def _prune(move_a, move_b, moves):
+    """
+    Finds the number of moves needed to solve every pair of two coordinates
+
+    This is a breadth first search out from the solved state, where both are 0
+
+    :param move_a: the move table of the first coordinate
+    :type move_a: numpy.ndarray
+    :param move_b: the move table of the second coordinate
+    :type move_b: numpy.ndarray
+    :param moves: the columns of the move tables to search with
+    :type moves: range
+    :return: the depth of a * len(move_b) + b for every pair
+    :rtype: numpy.ndarray
+    """
+    size_b = len(move_b)
+    move_a = move_a.astype(numpy.int64)
+    move_b = move_b.astype(numpy.int64)
+    depths = numpy.full(len(move_a) * size_b, -1, dtype=numpy.int8)
+    depths[0] = 0
+    frontier = numpy.array([0])
+    depth = 0
+    while len(frontier) > 0:
+        a, b = numpy.divmod(frontier, size_b)
+        found = []
+        for m in moves:
+            new = move_a[a, m] * size_b + move_b[b, m]
+            new = new[depths[new] == -1]
+            depths[new] = depth + 1
+            found.append(new)
+        frontier = numpy.unique(numpy.concatenate(found))
+        depth += 1
+    return depths
+
+
+TABLE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "solver_tables.bin"
+)
+"""The file the solver's tables are saved to, next to this file so it doesn't
+depend on the directory the game is run from
+:type: str"""
+TABLE_VERSION = 1
+"""Increase this whenever the tables change so old table files are rebuilt
+:type: int"""
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def get_tables():
+    """
+    Gets the solver's tables
+
+    The tables are memory-mapped from TABLE_FILE, it is built the first time this is
+    called or if it is corrupt or out of date. They are built in this process, as
+    this is called from the game's threads, where starting processes isn't safe.
+
+    :return: the read only tables by name
+    :rtype: dict[str, numpy.ndarray]
+    """
+    global _tables
+    # every hint engine shares the tables, so only one of them builds them
+    with _tables_lock:
+        if _tables is None:
+            store = TableStore(TABLE_FILE, TABLE_VERSION)
+            _tables = store.get(lambda: build_tables(processes=1))
+    return _tables
+
+
+def to_cubies(facelets):
+    """
+    Finds the position and orientation of every piece from the stickers
+
+    The colour of the middle square of each face is taken as the colour of that face
+
+    :param facelets: the 54 colour indices of the cube
+    :type facelets: numpy.ndarray or bytes
+    :return: the cube as (cp, co, ep, eo),
+        raises InvalidCube if the stickers don't make a real cube
+    :rtype: tuple[list[int], list[int], list[int], list[int]]
+    """
+    facelets = list(bytes(facelets))
+    centres = {facelets[FACE_POSITIONS[face] * 9 + 4]: face for face in FACES}
+    if len(centres) != 6:
+        raise InvalidCube("the middle squares are not 6 different colours")
+    if any(facelets.count(colour) != 9 for colour in centres):
+        raise InvalidCube("there are not 9 stickers of each colour")
+    faces = [centres[colour] for colour in facelets]
+
+    corners = {names: i for i, names in enumerate(CORNER_FACES)}
+    cp, co = [], []
+    for positions in CORNER_FACELETS:
+        names = [faces[position] for position in positions]
+        for twist in range(3):
+            if names[twist] in "UD":
+                break
+        else:
+            raise InvalidCube("a corner has no up or down sticker")
+        # read the corner clockwise from its up or down sticker
+        key = "".join(names[(twist + i) % 3] for i in range(3))
+        if key not in corners:
+            raise InvalidCube(f"there is no {key} corner")
+        cp.append(corners[key])
+        co.append(twist)
+
+    edges = {names: i for i, names in enumerate(EDGE_FACES)}
+    ep, eo = [], []
+    for positions in EDGE_FACELETS:
+        key = "".join(faces[position] for position in positions)
+        if key in edges:
+            ep.append(edges[key])
+            eo.append(0)
+        elif key[::-1] in edges:
+            ep.append(edges[key[::-1]])
+            eo.append(1)
+        else:
+            raise InvalidCube(f"there is no {key} edge")
+
+    if sorted(cp) != list(range(8)) or sorted(ep) != list(range(12)):
+        raise InvalidCube("a piece appears twice")
+    if sum(co) % 3 != 0:
+        raise InvalidCube("a corner is twisted")
+    if sum(eo) % 2 != 0:
+        raise InvalidCube("an edge is flipped")
+    if _parity(cp) != _parity(ep):
+        raise InvalidCube("two pieces are swapped")
+    return cp, co, ep, eo
+
+
+def _parity(perm):
+    """
+    :param perm: a permutation
+    :type perm: list[int]
+    :return: 0 for an even permutation, 1 for an odd one
+    :rtype: int
+    """
+    swaps = 0
+    for i in range(len(perm)):
+        for j in range(i + 1, len(perm)):
+            if perm[i] > perm[j]:
+                swaps += 1
+    return swaps % 2
+
+
+def _rank_list(perm):
+    """
+    :param perm: a permutation of 0 to n-1
+    :type perm: list[int]
+    :return: the lexicographic rank of the permutation
+    :rtype: int
+    """
+    rank = 0
+    n = len(perm)
+    for i in range(n - 1):
+        smaller = sum(1 for value in perm[i + 1 :] if value < perm[i])
+        rank += smaller * factorial(n - 1 - i)
+    return rank
+
+
+def _skip(move, last):
+    """
+    Checks whether a move is redundant after the previous move
+
+    A face isn't turned twice in a row, and opposite faces are only turned in one
+    order as they don't affect each other
+
+    :param move: the move to check
+    :type move: int
+    :param last: the previous move, or -1 if there isn't one
+    :type last: int
+    :rtype: bool
+    """
+    if last < 0:
+        return False
+    face, last_face = move // 3, last // 3
+    # opposite faces are 3 apart in URFDLB
+    return face == last_face or face == last_face - 3
+
+
+class _Search:
+    """A single two-phase search for the solution of one cube"""
+
+    def __init__(self, tables, cube, max_length, timeout):
+        """
+        :param tables: the solver tables, see build_tables
+        :type tables: dict[str, numpy.ndarray]
+        :param cube: the cube as (cp, co, ep, eo)
+        :type cube: tuple[list[int], list[int], list[int], list[int]]
+        :param max_length: stop searching once a solution this short is found
+        :type max_length: int
+        :param timeout: the number of seconds to search for a shorter solution
+        :type timeout: float
+        """
+        # flat memoryviews are much faster than numpy for single lookups,
+        # and they share memory with the tables rather than copying them
+        views = {
+            name: memoryview(table).cast("B").cast(table.dtype.char)
+            for name, table in tables.items()
+        }
+        self.twist_move = views["twist_move"]
+        self.flip_move = views["flip_move"]
+        self.slice_move = views["slice_move"]
+        self.corners_move = views["corners_move"]
+        self.edges_move = views["edges_move"]
+        self.twist_prune = views["twist_prune"]
+        self.flip_prune = views["flip_prune"]
+        self.corners_prune = views["corners_prune"]
+        self.edges_prune = views["edges_prune"]
+
+        self.cube = cube
+        self.max_length = max_length
+        self.deadline = time.monotonic() + timeout
+        self.path = []
+        """The moves of the current search path
+        :type: list[int]"""
+        self.best = None
+        """The shortest solution found so far
+        :type: list[int] or None"""
+
+    def done(self):
+        """
+        :return: whether the search should stop
+        :rtype: bool
+        """
+        if self.best is None:
+            return False
+        return len(self.best) <= self.max_length or time.monotonic() > self.deadline
+
+    def run(self):
+        """
+        Searches for a solution
+
+        :return: the move numbers of the shortest solution found
+        :rtype: list[int]
+        """
+        cp, co, ep, eo = self.cube
+        twist = _orientation_coordinate(numpy.array([co]), 3)[0]
+        flip = _orientation_coordinate(numpy.array([eo]), 2)[0]
+        positions = numpy.array([[ep.index(edge) for edge in range(8, 12)]])
+        slice_sorted = int(_slice_coordinate(positions)[0])
+        corners = _rank_list(cp)
+
+        depth = 0
+        while not self.done():
+            # a longer phase 1 can't beat the best solution so far
+            if self.best is not None and depth >= len(self.best):
+                break
+            self.phase1(int(twist), int(flip), slice_sorted, corners, depth)
+            depth += 1
+        return self.best
+
+    def phase1(self, twist, flip, slice_sorted, corners, togo):
+        """
+        Searches for every phase 1 solution of exactly togo more moves
+
+        :rtype: None
+        """
+        if togo == 0:
+            # the last phase 1 move must leave the phase 2 group, otherwise a shorter
+            # phase 1 solution would have found the same solution
+            in_group = twist == 0 and flip == 0 and slice_sorted < 24
+            if in_group and (not self.path or self.path[-1] not in PHASE2_MOVES):
+                self.start_phase2(slice_sorted, corners)
+            return
+
+        last = self.path[-1] if self.path else -1
+        for move in range(18):
+            if _skip(move, last):
+                continue
+            new_twist = self.twist_move[twist * 18 + move]
+            new_flip = self.flip_move[flip * 18 + move]
+            new_slice = self.slice_move[slice_sorted * 18 + move]
+            slice_set = new_slice // 24
+            if (
+                self.twist_prune[new_twist * SLICE_COUNT + slice_set] >= togo
+                or self.flip_prune[new_flip * SLICE_COUNT + slice_set] >= togo
+            ):
+                continue
+            self.path.append(move)
+            self.phase1(
+                new_twist,
+                new_flip,
+                new_slice,
+                self.corners_move[corners * 18 + move],
+                togo - 1,
+            )
+            self.path.pop()
+            if self.done():
+                return
+
+    def start_phase2(self, slice_sorted, corners):
+        """
+        Searches for the shortest phase 2 solution from the end of the current path
+
+        :param slice_sorted: the slice coordinate after the phase 1 moves, below 24
+        :type slice_sorted: int
+        :param corners: the corner permutation coordinate after the phase 1 moves
+        :type corners: int
+        :rtype: None
+        """
+        limit = 30 if self.best is None else len(self.best) - 1
+        limit -= len(self.path)
+        if limit < 0:
+            return
+        # the up and down layer edges aren't tracked in phase 1 as they are only
+        # valid in the phase 2 group, so find them by replaying the path
+        ep = self.cube[2]
+        for move in self.path:
+            ep = [ep[i] for i in MOVE_CUBES[move][2]]
+        edges = _rank_list(ep[:8])
+
+        phase1_length = len(self.path)
+        depth = max(
+            self.corners_prune[corners * 24 + slice_sorted],
+            self.edges_prune[edges * 24 + slice_sorted],
+        )
+        while depth <= limit:
+            if self.phase2(corners, edges, slice_sorted, depth):
+                self.best = list(self.path)
+                del self.path[phase1_length:]
+                return
+            depth += 1
+
+    def phase2(self, corners, edges, slice_sorted, togo):
+        """
+        Searches for a phase 2 solution of exactly togo more moves
+
+        :return: True if a solution was found, it is left on the path
+        :rtype: bool
+        """
+        if togo == 0:
+            return corners == 0 and edges == 0 and slice_sorted == 0
+
+        last = self.path[-1] if self.path else -1
+        for index, move in enumerate(PHASE2_MOVES):
+            if _skip(move, last):
+                continue
+            new_corners = self.corners_move[corners * 18 + move]
+            new_edges = self.edges_move[edges * 10 + index]
+            new_slice = self.slice_move[slice_sorted * 18 + move]
+            if (
+                self.corners_prune[new_corners * 24 + new_slice] >= togo
+                or self.edges_prune[new_edges * 24 + new_slice] >= togo
+            ):
+                continue
+            self.path.append(move)
+            if self.phase2(new_corners, new_edges, new_slice, togo - 1):
+                return True
+            self.path.pop()
+        return False
+
+
+def solve(facelets, max_length=22, timeout=5.0):
+    """
+    Finds a short solution for a cube
+
+    The search stops at the first solution of max_length or fewer moves.
+    If none has been found after timeout seconds, the shortest solution found so far
+    is returned.
+
+    :param facelets: the 54 colour indices of the cube
+    :type facelets: numpy.ndarray or bytes
+    :param max_length: the number of face moves that is short enough
+    :type max_length: int
+    :param timeout: the number of seconds to search for a short enough solution
+    :type timeout: float
+    :return: the solution in standard notation, e.g. ["R", "U2", "F'"]
+    :rtype: list[str]
+    """
+    cube = to_cubies(facelets)
+    solution = _Search(get_tables(), cube, max_length, timeout).run()
+    return [MOVE_NAMES[move] for move in solution]
+
+
+def to_moves(solution):
+    """
+    Converts a solution into moves in the format stored by game_data.MoveStack
+
+    The cube can only turn its up, down, left and right layers, so an x rotation is
+    added to bring the front or back face into the right or left position when they
+    need turning. The faces of the solution keep their original names.
+
+    :param solution: face moves in standard notation, e.g. ["R", "U2", "F'"]
+    :type solution: list[str]
+    :return: the moves as dictionaries
+    :rtype: list[dict]
+    """
+    # where each face of the solution currently is
+    position = {face: face for face in FACES}
+    # an x rotation moves the front to the right, the right to the back and so on
+    after_rotation = {"F": "R", "R": "B", "B": "L", "L": "F", "U": "U", "D": "D"}
+    # how each position turns clockwise, row_col, number and backwards
+    clockwise = {
+        "U": (True, 0, True),
+        "D": (True, 2, False),
+        "L": (False, 0, True),
+        "R": (False, 2, False),
+    }
+
+    result = []
+    for move in solution:
+        face = move[0]
+        if position[face] in "FB":
+            result.append({"rotation": True, "direction": "x"})
+            position = {key: after_rotation[value] for key, value in position.items()}
+        row_col, number, backwards = clockwise[position[face]]
+        if move[1:] == "'":
+            backwards = not backwards
+        turn = {"direction": row_col, "number": number, "backwards": backwards}
+        result.append(turn)
+        if move[1:] == "2":
+            result.append(dict(turn))
+    return result
+
+
+if __name__ == "__main__":
+    # build the tables ahead of time, the processes need this guard to start
+    start = time.perf_counter()
+    TableStore(TABLE_FILE, TABLE_VERSION).save(build_tables(processes=None))
+    print(f"Built {TABLE_FILE} in {time.perf_counter() - start:.1f}s")
@@ -7,9 +7,16 @@ as well as loading and saving data to a file
 black, isort and flake8 used for formatting
 """
 
+import logging
+import threading
+import time
+
+import facelets
 import game_data as gd
 import tools
 
+logger = logging.getLogger(__name__)
+
 
 # game history
 class History:
@@ -19,7 +26,7 @@ class History:
         # do not change these as they are used for saving
         # they are directly aquired by self.__dict__ in the add method
         # even changing thier order will break things
-        self.game_state = gd.used_cube
+        self.game_state = facelets.to_nested(gd.used_cube, gd.palette)
         """The 3D array of the cube state at the last move
         :type: list"""
         self.move_count = gd.move_count
@@ -54,9 +61,9 @@ class History:
 
     def add_game(self):
         """Adds the current game to game history using the game_data"""
-        self.game_state = gd.used_cube
+        self.game_state = facelets.to_nested(gd.used_cube, gd.palette)
         self.move_count = gd.move_count
-        self.moves = gd.moves.get_stack()
+        self.moves = list(gd.moves.get_stack())  # the stack changes after the game
         self.scrambler_count = gd.scrambler_count
         self.time_taken = gd.time_taken
         self.time_started = gd.start_time
@@ -99,7 +106,7 @@ class User:
     def __init__(
         self,
         username=None,
-        cube_state=gd.used_cube,
+        cube_state=gd.default_cube,
         start_time=gd.start_time,
         time_taken=gd.time_taken,
         moves=gd.moves.get_stack(),
@@ -155,25 +162,29 @@ class User:
         """
         if username is not None:
             self.username = username
-        self.cube_state = gd.used_cube
+        self.cube_state = facelets.to_nested(gd.used_cube, gd.palette)
         self.start_time = gd.start_time
         self.time_taken = gd.time_taken
         self.moves = gd.moves.get_stack()
         self.move_count = gd.move_count
         self.scrambler_count = gd.scrambler_count
-        self.hints_used = (gd.hints_used,)
+        self.hints_used = gd.hints_used
         self.solver_used = gd.solver_used
         self.history = game_history.get_history()
 
     def load(self):
         """Updates the current game data to this class's attributes"""
-        gd.used_cube = self.cube_state
+        gd.set_cube(facelets.from_nested(self.cube_state, gd.palette))
         gd.start_time = self.start_time
         gd.time_taken = self.time_taken
         gd.moves.set_stack(self.moves)
         gd.move_count = self.move_count
         gd.scrambler_count = self.scrambler_count
-        gd.hints_used = (self.hints_used,)
+        hints_used = self.hints_used
+        # older saves wrapped the value in a tuple each time it was saved
+        while isinstance(hints_used, (list, tuple)):
+            hints_used = len(hints_used) > 0 and hints_used[0]
+        gd.hints_used = hints_used
         gd.solver_used = self.solver_used
         game_history.replace_history(self.history)
 
@@ -181,9 +192,11 @@ class User:
 class Manager:
     """This class handles data in a txt file"""
 
-    user_file = tools.File("saves_data.txt", User)
+    user_file = tools.File("saves_data.txt", User, journal=True)
     username = None
     obj = None
+    lock = threading.Lock()
+    """Held while user_file is used, as it is written by the autosave thread"""
 
     @staticmethod
     def load(username):
@@ -194,29 +207,171 @@ class Manager:
         :type username: str
         """
         Manager.username = username
-        try:
-            Manager.obj = Manager.user_file.get_object(Manager.username)
-        except tools.ObjectNotFound:
-            Manager.obj = User(Manager.username)
-            Manager.user_file.add_object(Manager.obj)
+        with Manager.lock:
+            try:
+                Manager.obj = Manager.user_file.get_object(Manager.username)
+            except tools.ObjectNotFound:
+                Manager.obj = User(Manager.username)
+                Manager.user_file.add_object(Manager.obj)
 
         Manager.obj.load()
 
     @staticmethod
-    def save(username=None):
+    def get_snapshot():
         """
-        Save the user data, and optionally change the username
+        Copies the current game data so it can be saved while the game carries on
 
-        :param username: the new username, defaults to None
-        :type username: str, optional
+        :return: the user's data, which nothing else refers to
+        :rtype: User
         """
-        if username is not None:
-            # replace the username
-            Manager.obj = User(username)
-            Manager.user_file.update_object(Manager.username, Manager.obj)
-            Manager.username = username
-
-        # save the data
-        Manager.obj.save(Manager.username)
-        Manager.user_file.update_object(Manager.username, Manager.obj)
-        Manager.user_file.save()
+        user = User(Manager.username)
+        user.save(Manager.username)
+        # the snapshot gets its own lists, so the game can replace or add to its
+        # lists without changing it. The moves and games in them are never changed
+        user.moves = list(user.moves)
+        user.history = list(user.history)
+        return user
+
+    @staticmethod
+    def write(user):
+        """
+        Saves a snapshot of the user's data to the file
+
+        :param user: the snapshot from get_snapshot
+        :type user: User
+        :rtype: None
+        """
+        with Manager.lock:
+            Manager.user_file.update_object(user.username, user)
+            Manager.obj = user
+            Manager.user_file.save()
+
+
+class AutoSave:
+    """
+    Saves the user's data in a background thread whenever it has changed
+
+    The game loop only copies the data, the thread writes it to the file, so saving
+    never waits for the disk. Changes made within interval seconds of the last save
+    are saved together.
+    """
+
+    def __init__(self, interval=5.0):
+        """
+        :param interval: the fewest seconds between saves
+        :type interval: float
+        """
+        self.interval = interval
+
+        self.saved_key = self.get_key()
+        """The key of the data when it was last saved
+        :type: tuple"""
+        self.last_save = time.monotonic()
+        """When the data was last handed to the thread, from time.monotonic
+        :type: float"""
+        self.pending = None
+        """The latest snapshot that has not been written yet
+        :type: User or None"""
+        self.worker = None
+        """The thread writing snapshots, None if it isn't running
+        :type: threading.Thread or None"""
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(timing=False):
+        """
+        The time taken changes every frame while the timer is running, so it is left
+        out until the timer stops. Until then it is saved along with other changes,
+        and when the game closes.
+
+        :param timing: whether the timer is running
+        :type timing: bool
+        :return: the values that change when the user's data does, such as a move
+            being made, the timer starting or a game being added to the history
+        :rtype: tuple
+        """
+        return (
+            gd.state_version,
+            gd.move_count,
+            gd.scrambler_count,
+            gd.start_time,
+            None if timing else gd.time_taken,
+            gd.hints_used,
+            gd.solver_used,
+            len(game_history.get_history()),
+        )
+
+    def update(self, now=None, timing=False):
+        """
+        Hands a snapshot to the thread if the data has changed and enough time
+        has passed, called every frame
+
+        :param now: the time from time.monotonic, defaults to the current time
+        :type now: float, optional
+        :param timing: whether the timer is running, see get_key
+        :type timing: bool, optional
+        :rtype: None
+        """
+        if Manager.username is None:
+            return
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_save < self.interval:
+            return
+        key = self.get_key(timing)
+        if key == self.saved_key:
+            return
+        self.submit(Manager.get_snapshot())
+        self.saved_key = key
+        self.last_save = now
+
+    def submit(self, user):
+        """
+        Starts writing a snapshot in the thread
+
+        :param user: the snapshot from Manager.get_snapshot
+        :type user: User
+        :rtype: None
+        """
+        with self.lock:
+            # only the latest snapshot matters, older ones are out of date
+            self.pending = user
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._work, daemon=True)
+                self.worker.start()
+
+    def stop(self):
+        """
+        Saves any changes, including the time taken, and waits for them to be
+        written, used when closing
+
+        :rtype: None
+        """
+        if Manager.username is not None and self.get_key() != self.saved_key:
+            self.submit(Manager.get_snapshot())
+            self.saved_key = self.get_key()
+        with self.lock:
+            worker = self.worker
+        if worker is not None:
+            worker.join()
+
+    def _work(self):
+        """Writes snapshots until there are none left"""
+        try:
+            while True:
+                with self.lock:
+                    user = self.pending
+                    self.pending = None
+                    if user is None:
+                        self.worker = None
+                        return
+                try:
+                    Manager.write(user)
+                except Exception:
+                    # the next snapshot is still saved, as it has every change
+                    logger.exception("Saving the user's data failed")
+        finally:
+            # a new thread is started for the next snapshot even if this one failed
+            with self.lock:
+                if self.worker is threading.current_thread():
+                    self.worker = None